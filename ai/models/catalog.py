@@ -0,0 +1,212 @@
+import os
+from typing import Any, Dict, Optional
+from ai.models.profile import CPUProfile
+
+def detected_cores() -> int:
+    """Cores this process may run on, honouring CPU affinity and container cpusets"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+TORCH_OPTIONS = ("profile", "dtype", "quantize", "compile")
+GGUF_OPTIONS = ("file", "context", "batch", "mlock", "gpu_layers")
+SAMPLING_OPTIONS = ("temperature", "top_p", "top_k", "max_tokens")
+
+# Backend name: model kind, module, class and the options it accepts besides repo and threads
+BACKENDS = {
+    "qwen": ("llm", "ai.models.llm.Qwen", "Qwen", TORCH_OPTIONS + SAMPLING_OPTIONS),
+    "gguf": ("llm", "ai.models.llm.DolphinGGUF", "DolphinGGUF", GGUF_OPTIONS + SAMPLING_OPTIONS),
+    "mms": ("tts", "ai.models.tts.Facebook", "FacebookMms", TORCH_OPTIONS),
+    "mms-onnx": ("tts", "ai.models.tts.FacebookOnnx", "FacebookMmsOnnx", ()),
+}
+
+# Backends running torch modules, the only ones CPU profiles fully apply to
+TORCH_BACKENDS = ("qwen", "mms")
+
+# Values used when an entry leaves an option out
+DEFAULTS = {
+    "qwen": {"profile": "default", "max_tokens": 1024},
+    "gguf": {"context": 4096, "batch": 512, "mlock": True, "gpu_layers": -1, "temperature": 0.7, "max_tokens": 2048},
+    "mms": {"profile": "default"},
+    "mms-onnx": {},
+}
+
+# Catalog used when config.yaml declares no models, a declared kind replaces its default list
+DEFAULT_CATALOG = {
+    "current": {"llm": "Qwen/Qwen3-0.6B", "tts": "facebook/mms-tts-fra"},
+    "llm": {
+        "Qwen/Qwen3-0.6B": {"backend": "qwen"},
+        "dphn/Dolphin-X1-8B-GGUF": {"backend": "gguf", "file": "Dolphin-X1-8B-Q8_0.gguf"},
+        "dphn/Dolphin3.0-Llama3.1-8B-GGUF-F16": {
+            "backend": "gguf",
+            "repo": "dphn/Dolphin3.0-Llama3.1-8B-GGUF",
+            "file": "Dolphin3.0-Llama3.1-8B-F16.gguf",
+        },
+        "dphn/Dolphin3.0-Llama3.1-8B-GGUF-Q8": {
+            "backend": "gguf",
+            "repo": "dphn/Dolphin3.0-Llama3.1-8B-GGUF",
+            "file": "Dolphin3.0-Llama3.1-8B-Q8_0.gguf",
+        },
+        "NEO matrix 20b Q8": {
+            "backend": "gguf",
+            "repo": "DavidAU/OpenAi-GPT-oss-20b-abliterated-uncensored-NEO-Imatrix-gguf",
+            "file": "OpenAI-20B-NEOPlus-Uncensored-Q8_0.gguf",
+        },
+        "HERETIC 20b Q8": {
+            "backend": "gguf",
+            "repo": "DavidAU/OpenAi-GPT-oss-20b-HERETIC-uncensored-NEO-Imatrix-gguf",
+            "file": "OpenAI-20B-NEOPlus-Uncensored-Q8_0.gguf",
+        },
+    },
+    "tts": {
+        "facebook/mms-tts-fra": {"backend": "mms"},
+        "facebook/mms-tts-eng": {"backend": "mms"},
+        "facebook/mms-tts-fra-onnx": {"backend": "mms-onnx", "repo": "facebook/mms-tts-fra"},
+        "facebook/mms-tts-eng-onnx": {"backend": "mms-onnx", "repo": "facebook/mms-tts-eng"},
+    },
+}
+
+class ModelSpec:
+    """Entry of the model catalog: the backend serving a model and its runtime settings"""
+    name: str
+    kind: str
+    backend: str
+    repo: str
+    threads: int
+    options: Dict[str, Any]
+    profile: CPUProfile
+
+    def __init__(self, name: str, kind: str, backend: str, repo: Optional[str] = None, threads: Optional[int] = None, **options):
+        where = f"models.{kind}.{name}"
+        if backend not in BACKENDS:
+            raise ValueError(f"{where}: unknown backend {backend}, available: {', '.join(BACKENDS)}")
+
+        backend_kind, _, _, accepted = BACKENDS[backend]
+        if backend_kind != kind:
+            raise ValueError(f"{where}: backend {backend} serves {backend_kind} models, not {kind}")
+
+        unknown = set(options) - set(accepted)
+        if unknown:
+            raise ValueError(f"{where}: options {', '.join(sorted(unknown))} do not apply to the {backend} backend")
+
+        options = {**DEFAULTS[backend], **options}
+        threads = threads if threads is not None else detected_cores()
+        if threads < 1:
+            raise ValueError(f"{where}: threads must be at least 1, got {threads}")
+        if backend == "gguf" and not options.get("file"):
+            raise ValueError(f"{where}: the gguf backend needs the file to download from the repo")
+        for option in ("context", "batch", "max_tokens"):
+            if option in options and options[option] < 1:
+                raise ValueError(f"{where}: {option} must be at least 1, got {options[option]}")
+        if options.get("temperature", 0) < 0:
+            raise ValueError(f"{where}: temperature must be positive, got {options['temperature']}")
+        if not 0 < options.get("top_p", 1) <= 1:
+            raise ValueError(f"{where}: top_p must be in ]0, 1], got {options['top_p']}")
+        if options.get("top_k", 0) < 0:
+            raise ValueError(f"{where}: top_k must be positive, got {options['top_k']}")
+
+        try:
+            profile = CPUProfile.from_config({
+                "preset": options.get("profile", "default"),
+                **{option: options[option] for option in ("dtype", "quantize", "compile") if option in options},
+                "threads": threads,
+            })
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{where}: {e}")
+
+        self.name = name
+        self.kind = kind
+        self.backend = backend
+        self.repo = repo or name
+        self.threads = threads
+        self.options = options
+        self.profile = profile
+
+    @classmethod
+    def from_dict(cls, name: str, kind: str, data: Optional[Dict[str, Any]]) -> 'ModelSpec':
+        data = dict(data or {})
+        if "backend" not in data:
+            raise ValueError(f"models.{kind}.{name}: backend is required, available: {', '.join(BACKENDS)}")
+        try:
+            return ModelSpec(name, kind, **data)
+        except TypeError as e:
+            raise ValueError(f"models.{kind}.{name}: invalid options, {e}")
+
+    @property
+    def sampling(self) -> Dict[str, Any]:
+        return {option: self.options[option] for option in SAMPLING_OPTIONS if option in self.options}
+
+    @property
+    def module(self) -> str:
+        return BACKENDS[self.backend][1]
+
+    @property
+    def class_name(self) -> str:
+        return BACKENDS[self.backend][2]
+
+    def backend_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments of the backend class, besides the repository"""
+        kwargs: Dict[str, Any] = {"profile": self.profile, **self.sampling}
+        if self.backend == "gguf":
+            kwargs.update(
+                filename=self.options["file"],
+                context=self.options["context"],
+                batch=self.options["batch"],
+                mlock=self.options["mlock"],
+                gpu_layers=self.options["gpu_layers"],
+            )
+
+        return kwargs
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Settings the backend runs with, options it does not have are None"""
+        torch = self.backend in TORCH_BACKENDS
+        return {
+            "backend": self.backend,
+            "repo": self.repo,
+            "file": self.options.get("file"),
+            "threads": self.threads,
+            "context": self.options.get("context"),
+            "batch": self.options.get("batch"),
+            "mlock": self.options.get("mlock"),
+            "gpu_layers": self.options.get("gpu_layers"),
+            "dtype": self.profile.dtype if torch else None,
+            "quantize": self.profile.quantize if torch else None,
+            "compile": self.profile.compile if torch else None,
+            "sampling": self.sampling,
+        }
+
+class ModelCatalog:
+    """Models the server can serve, by kind and registry name, and the ones current at startup"""
+    specs: Dict[str, Dict[str, ModelSpec]]
+    current: Dict[str, str]
+
+    def __init__(self, specs: Dict[str, Dict[str, ModelSpec]], current: Dict[str, str]):
+        for kind in ("llm", "tts"):
+            if not specs.get(kind):
+                raise ValueError(f"models.{kind} must declare at least one model")
+            if current.get(kind) not in specs[kind]:
+                raise ValueError(f"models.current.{kind}: model {current.get(kind)} is not in models.{kind}")
+
+        self.specs = specs
+        self.current = current
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'ModelCatalog':
+        """Catalog from the models section, kinds it leaves out keep the default list"""
+        data = data or {}
+        current = dict(data.get("current") or {})
+        unknown = set(current) - {"llm", "tts"}
+        if unknown:
+            raise ValueError(f"Unknown model kinds in models.current: {', '.join(sorted(unknown))}")
+
+        specs = {}
+        for kind in ("llm", "tts"):
+            entries = data.get(kind) or DEFAULT_CATALOG[kind]
+            specs[kind] = {name: ModelSpec.from_dict(name, kind, entry) for name, entry in entries.items()}
+            if kind not in current:
+                # The default current model, or the first one declared when the list was replaced
+                default = DEFAULT_CATALOG["current"][kind]
+                current[kind] = default if default in specs[kind] else next(iter(specs[kind]), None)
+
+        return ModelCatalog(specs, current)
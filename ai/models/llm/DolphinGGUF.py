@@ -1,15 +1,98 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from huggingface_hub import hf_hub_download
 from ai.models.models import Model
-from llama_cpp import Llama
+from ai.models.catalog import detected_cores
+from ai.models.profile import CPUProfile
+from ai.models.llm.streaming import AnswerSentenceStream
+from ai.models.llm.structured import ANSWER_GRAMMAR, parse_answer
+from llama_cpp import Llama, LlamaGrammar
+from llama_cpp.llama import LlamaState
+import numpy as np
+import hashlib
+import struct
 import os   
 import json
 
+# Snapshots of the llama.cpp state after the system prompt, per model file and prompt
+STATE_DIR = "./cache/state"
+
+# Snapshot files are a length-prefixed JSON header followed by the raw llama.cpp state,
+# nothing in them is ever executed when read back
+_HEADER_SIZE = struct.Struct(">I")
+
+
+def _write_snapshot(path: str, saved: Dict[str, Any]) -> None:
+    header = json.dumps({
+        "tokens": saved["tokens"],
+        "llama_state_size": saved["llama_state_size"],
+        "seed": saved["seed"],
+    }).encode()
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(_HEADER_SIZE.pack(len(header)))
+        f.write(header)
+        f.write(bytes(saved["llama_state"][:saved["llama_state_size"]]))
+    os.replace(f"{path}.tmp", path)
+
+
+def _read_snapshot(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        (header_size,) = _HEADER_SIZE.unpack(f.read(_HEADER_SIZE.size))
+        header = json.loads(f.read(header_size))
+        llama_state = f.read()
+
+    tokens, size, seed = header["tokens"], header["llama_state_size"], header["seed"]
+    if not isinstance(tokens, list) or not all(isinstance(token, int) for token in tokens):
+        raise ValueError("tokens are not a list of token ids")
+    if not isinstance(seed, int):
+        raise ValueError(f"seed is not an integer: {seed!r}")
+    if size != len(llama_state):
+        raise ValueError(f"expected {size} bytes of llama state, got {len(llama_state)}")
+
+    return {"tokens": tokens, "llama_state": llama_state, "llama_state_size": size, "seed": seed}
+
 class DolphinGGUF(Model):
-    """Language Model class for text generation"""
+    """Language Model class for text generation.
+
+    With `structured_output`, sampling follows a grammar only accepting
+    `{"answer": "..."}`, so the reply always parses and ends with its closing brace.
+    """
+
+    TEMPERATURE = 0.7
+    MAX_TOKENS = 2048
     
-    def __init__(self, model_name: str = "dphn/Dolphin-X1-8B-GGUF", filename: str = "Dolphin-X1-8B-Q8_0.gguf"):
-        super().__init__(model_name)
+    def __init__(
+        self,
+        model_name: str = "dphn/Dolphin-X1-8B-GGUF",
+        filename: str = "Dolphin-X1-8B-Q8_0.gguf",
+        structured_output: bool = True,
+        profile: Optional[CPUProfile] = None,
+        context: int = 4096,
+        batch: int = 512,
+        mlock: bool = True,
+        gpu_layers: int = -1,
+        max_tokens: int = MAX_TOKENS,
+        temperature: float = TEMPERATURE,
+        top_p: Optional[float] = None,
+        top_k: Optional[int] = None
+    ):
+        super().__init__(model_name, profile)
+        if self.profile.quantize or self.profile.dtype != "float32" or self.profile.compile:
+            # GGUF weights are already quantized by the file, only the thread count applies
+            print(f"⚠️  {model_name}: quantize, dtype and compile do not apply to GGUF models, only threads is used")
         self.filename = filename
+        self.structured_output = structured_output
+        self.context = context
+        self.batch = batch
+        self.mlock = mlock
+        self.gpu_layers = gpu_layers
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.top_p = top_p
+        self.top_k = top_k
+        self.grammar = None
+        self.model_path: Optional[str] = None
+        # Last system prompt with its prefix tokens and the state right after them
+        self._prefix_state: Optional[Tuple[str, List[int], LlamaState]] = None
 
     def _download_and_load_gguf(self):
         if not os.path.exists(f"./cache/{self.filename}"):
@@ -31,39 +114,185 @@ class DolphinGGUF(Model):
         if not self.is_loaded:
             print(f"🔄 Loading model: {self.model_name}")
             model_path = self._download_and_load_gguf()
+            self.model_path = model_path
             self.model = Llama(
                 model_path=model_path,
-                n_ctx=4096,
-                n_threads=8,
-                n_gpu_layers=-1,
-                n_batch=512,
-                use_mlock=True,
+                n_ctx=self.context,
+                n_threads=self.profile.threads or detected_cores(),
+                n_gpu_layers=self.gpu_layers,
+                n_batch=self.batch,
+                use_mlock=self.mlock,
                 use_mmap=True,
                 verbose=False
             )
+            if self.structured_output:
+                self.grammar = LlamaGrammar.from_string(ANSWER_GRAMMAR, verbose=False)
             self.is_loaded = True
             print(f"✅ Model loaded successfully: {self.model_name}")
 
+    def unload(self) -> None:
+        """Unload the model, dropping the state snapshot taken with it"""
+        self._prefix_state = None
+        super().unload()
+
+    def memory_bytes(self) -> int:
+        """Size of the GGUF file, its weights are memory mapped and locked once loaded"""
+        if not self.is_loaded or self.model_path is None:
+            return 0
+        return os.path.getsize(self.model_path)
+
+    def _state_path(self, system_prompt: str) -> str:
+        """Snapshot path of the prompt, keyed by repository and model file too since files of
+        different repositories can share a name, and a re-downloaded file invalidates it"""
+        stat = os.stat(self.model_path)
+        key = hashlib.sha256(
+            f"{self.model_name}\n{stat.st_size}\n{stat.st_mtime_ns}\n{self.model.n_ctx()}\n{system_prompt}".encode()
+        ).hexdigest()[:16]
+        return os.path.join(STATE_DIR, f"{self.filename}.{key}.state")
+
+    def _restore_prefix(self, system_prompt: str) -> None:
+        """Put the context right after the system prompt, so only the event tokens are evaluated.
+
+        llama.cpp skips evaluating the tokens matching the start of its current context.
+        The state after the system prompt is snapshotted once, kept on disk across
+        restarts, and restored whenever the context no longer starts with it.
+        """
+        if self._prefix_state is None or self._prefix_state[0] != system_prompt:
+            self._prefix_state = self._load_prefix_state(system_prompt)
+
+        _, tokens, state = self._prefix_state
+        if self.model.n_tokens >= len(tokens) and self.model.input_ids[:len(tokens)].tolist() == tokens:
+            return
+
+        try:
+            self.model.load_state(state)
+        except Exception as e:
+            # Saved by an incompatible llama.cpp build or model, computing it again leaves
+            # the context right after the system prompt
+            path = self._state_path(system_prompt)
+            print(f"⚠️  Discarding incompatible state {path}: {e}")
+            self._prefix_state = None
+            if os.path.exists(path):
+                os.remove(path)
+            self._prefix_state = self._load_prefix_state(system_prompt)
+
+    def _load_prefix_state(self, system_prompt: str) -> Tuple[str, List[int], LlamaState]:
+        path = self._state_path(system_prompt)
+        if os.path.exists(path):
+            try:
+                saved = _read_snapshot(path)
+                print(f"📦 Restored system prompt state from {path}")
+                return system_prompt, saved["tokens"], self._to_state(saved)
+            except Exception as e:
+                print(f"⚠️  Ignoring unreadable state {path}, computing it again: {e}")
+
+        tokens = self._prefix_tokens(system_prompt)
+        # Cells past the prefix stay in the snapshot, they are dropped on the next eval
+        self.model.n_tokens = len(tokens)
+        state = self.model.save_state()
+
+        saved = {
+            "tokens": tokens,
+            "llama_state": state.llama_state,
+            "llama_state_size": state.llama_state_size,
+            "seed": state.seed,
+        }
+        os.makedirs(STATE_DIR, exist_ok=True)
+        _write_snapshot(path, saved)
+        print(f"📦 Saved system prompt state of {len(tokens)} tokens to {path}")
+
+        return system_prompt, tokens, self._to_state(saved)
+
+    def _prefix_tokens(self, system_prompt: str) -> List[int]:
+        """Tokens the chat format puts before any user input, found by formatting two probes"""
+        self.model.reset()
+        self.model.create_chat_completion(messages=self._build_messages(system_prompt, "a"), max_tokens=1)
+        first = list(self.model.eval_tokens)
+        # Shares the system prompt with the first probe, so only the rest is evaluated
+        self.model.create_chat_completion(messages=self._build_messages(system_prompt, "b"), max_tokens=1)
+        second = list(self.model.eval_tokens)
+
+        return first[:Llama.longest_token_prefix(first, second)]
+
+    def _to_state(self, saved: Dict[str, Any]) -> LlamaState:
+        """Rebuild a LlamaState, logits of the prefix are never read so they are not kept"""
+        input_ids = np.zeros(self.model.n_ctx(), dtype=np.intc)
+        input_ids[:len(saved["tokens"])] = saved["tokens"]
+
+        return LlamaState(
+            input_ids=input_ids,
+            scores=np.zeros((1, self.model.n_vocab()), dtype=np.single),
+            n_tokens=len(saved["tokens"]),
+            llama_state=saved["llama_state"],
+            llama_state_size=saved["llama_state_size"],
+            seed=saved["seed"],
+        )
+
     
+    def sampling_params(self) -> Dict[str, Any]:
+        """Quantized file and sampling settings, used to key cached responses"""
+        return {
+            "filename": self.filename,
+            **self._completion_kwargs(),
+            "structured_output": self.structured_output
+        }
+
+    def _completion_kwargs(self) -> Dict[str, Any]:
+        """Sampling arguments of create_chat_completion, unset ones keep the llama.cpp defaults"""
+        kwargs = {"temperature": self.temperature, "max_tokens": self.max_tokens}
+        if self.top_p is not None:
+            kwargs["top_p"] = self.top_p
+        if self.top_k is not None:
+            kwargs["top_k"] = self.top_k
+        return kwargs
+
+    def _build_messages(self, system_prompt: str, user_input: str):
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_input},
+        ]
+
     def generate(self, system_prompt: str, user_input: str) -> str:
         """Generate a response from the LLM"""
         if not self.is_loaded:
             raise RuntimeError("Model must be loaded before generating. Call load() first.")
-        
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_input},
-        ]
 
+        self._restore_prefix(system_prompt)
         response = self.model.create_chat_completion(
-            messages=messages,
-            temperature=0.7,
-            max_tokens=2048
+            messages=self._build_messages(system_prompt, user_input),
+            **self._completion_kwargs(),
+            grammar=self.grammar
         )
 
+        if self.structured_output:
+            return parse_answer(response['choices'][0]['message']['content'])
+
         res = response['choices'][0]['message']['content'].strip('```json').strip('```')
 
         if res.startswith('{{') and res.endswith('}}'):
             res = res[1:-1]
 
         return json.loads(res)
+
+    def generate_stream(self, system_prompt: str, user_input: str) -> Iterator[str]:
+        """Yield the sentences of the answer field as soon as they are decoded"""
+        if not self.is_loaded:
+            raise RuntimeError("Model must be loaded before generating. Call load() first.")
+
+        self._restore_prefix(system_prompt)
+        chunks = self.model.create_chat_completion(
+            messages=self._build_messages(system_prompt, user_input),
+            **self._completion_kwargs(),
+            grammar=self.grammar,
+            stream=True
+        )
+
+        stream = AnswerSentenceStream()
+        for chunk in chunks:
+            content = chunk['choices'][0]['delta'].get('content')
+            if content:
+                yield from stream.feed(content)
+        yield from stream.finish()
+
+        if not stream.found:
+            raise ValueError(f"No answer field in {self.model_name} output")
@@ -1,54 +1,195 @@
+import copy
+from threading import Event, Thread
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from ai.models.models import Model
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from ai.models.profile import CPUProfile
+from ai.models.llm.streaming import AnswerSentenceStream
+from ai.models.llm.structured import ANSWER_PREFILL, parse_answer
+from transformers import AutoModelForCausalLM, AutoTokenizer, DynamicCache, StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+import torch
 import json
 
+# <think> and </think> tokens around the reasoning block
+THINK_START_TOKEN_ID = 151667
+THINK_END_TOKEN_ID = 151668
+
+
+class _StopWhenSet(StoppingCriteria):
+    """Stops generate once the event is set from another thread"""
+
+    def __init__(self, event: Event):
+        self.event = event
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        return torch.full((input_ids.shape[0],), self.event.is_set(), dtype=torch.bool, device=input_ids.device)
+
 
 class Qwen(Model):
-    """Language Model class for text generation"""
-    
-    def __init__(self, model_name: str = "Qwen/Qwen3-0.6B"):
-        super().__init__(model_name)
-    
-    
+    """Language Model class for text generation.
+
+    With `structured_output`, thinking is disabled and the reply is prefilled with
+    `{"answer": "`, so the model only writes the answer string and decoding stops at
+    its closing quote.
+    """
+
+    MAX_NEW_TOKENS = 32768
+    # Budget of a structured answer, a commentary line never needs more
+    MAX_ANSWER_TOKENS = 1024
+
+    def __init__(
+        self,
+        model_name: str = "Qwen/Qwen3-0.6B",
+        structured_output: bool = True,
+        profile: Optional[CPUProfile] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        top_k: Optional[int] = None
+    ):
+        super().__init__(model_name, profile)
+        self.structured_output = structured_output
+        self.max_tokens = max_tokens
+        # Overrides of the generation config shipped with the model
+        self.sampling = {
+            key: value for key, value in {"temperature": temperature, "top_p": top_p, "top_k": top_k}.items()
+            if value is not None
+        }
+        # Last system prompt with its chat prefix text and token ids
+        self._system_prefix: Optional[Tuple[str, Optional[Tuple[str, List[int]]]]] = None
+        # Last system prompt with the past key values of its chat prefix
+        self._prefix_cache: Optional[Tuple[str, DynamicCache]] = None
+
+
     def load(self) -> None:
         """Load the model and tokenizer into memory"""
         if not self.is_loaded:
             print(f"🔄 Loading model: {self.model_name}")
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            self.model = AutoModelForCausalLM.from_pretrained(self.model_name).to(self.device)
+            # Batched prompts are aligned on their last token
+            self.tokenizer.padding_side = "left"
+            self.model = self.profile.prepare(AutoModelForCausalLM.from_pretrained(self.model_name).to(self.device))
+            self.model.generation_config.update(**self.sampling)
             self.is_loaded = True
             print(f"✅ Model loaded successfully: {self.model_name}")
 
-    
-    def generate(self, system_prompt: str, user_input: str) -> str:
-        """Generate a response from the LLM"""
-        if not self.is_loaded:
-            raise RuntimeError("Model must be loaded before generating. Call load() first.")
-        
+    def unload(self) -> None:
+        """Unload the model, dropping the prefix caches computed with it"""
+        self._system_prefix = None
+        self._prefix_cache = None
+        super().unload()
+
+    @property
+    def max_new_tokens(self) -> int:
+        if self.max_tokens is not None:
+            return self.max_tokens
+        return self.MAX_ANSWER_TOKENS if self.structured_output else self.MAX_NEW_TOKENS
+
+    def sampling_params(self) -> Dict[str, Any]:
+        """Sampling settings of the generation config, used to key cached responses"""
+        params: Dict[str, Any] = {"max_new_tokens": self.max_new_tokens, "structured_output": self.structured_output}
+        if self.model is not None:
+            config = self.model.generation_config
+            params.update(do_sample=config.do_sample, temperature=config.temperature, top_k=config.top_k, top_p=config.top_p)
+
+        return params
+
+    def _chat_text(self, system_prompt: str, user_input: str) -> str:
+        """Apply the chat template to the conversation"""
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_input},
         ]
 
-        text = self.tokenizer.apply_chat_template(
+        if not self.structured_output:
+            return self.tokenizer.apply_chat_template(
+                messages,
+                tokenize=False,
+                add_generation_prompt=True,
+            )
+
+        return self.tokenizer.apply_chat_template(
             messages,
             tokenize=False,
             add_generation_prompt=True,
-        )
+            enable_thinking=False,
+        ) + ANSWER_PREFILL
+
+    def _prefix_for(self, system_prompt: str) -> Optional[Tuple[str, List[int]]]:
+        """Chat prefix holding the system prompt and its token ids, tokenized once per system prompt.
 
-        model_inputs = self.tokenizer([text], return_tensors="pt").to(self.device)
+        None when the prefix does not tokenize the same on its own as in a full conversation.
+        """
+        if self._system_prefix is not None and self._system_prefix[0] == system_prompt:
+            return self._system_prefix[1]
 
-        # conduct text completion
-        generated_ids = self.model.generate(
-            **model_inputs,
-            max_new_tokens=32768
+        text = self.tokenizer.apply_chat_template(
+            [{"role": "system", "content": system_prompt}],
+            tokenize=False,
         )
-        output_ids = generated_ids[0][len(model_inputs.input_ids[0]):].tolist() 
+        ids = self.tokenizer(text, add_special_tokens=False).input_ids
+
+        probe = self._chat_text(system_prompt, "")
+        prefix = (text, ids)
+        if not probe.startswith(text) or self.tokenizer(probe).input_ids[:len(ids)] != ids:
+            prefix = None
+
+        self._system_prefix = (system_prompt, prefix)
+        return prefix
+
+    def _prefix_cache_for(self, system_prompt: str, prefix_ids: List[int]) -> DynamicCache:
+        """Past key values of the chat prefix, computed once per system prompt"""
+        if self._prefix_cache is not None and self._prefix_cache[0] == system_prompt:
+            return self._prefix_cache[1]
+
+        outputs = self.model(input_ids=torch.tensor([prefix_ids], device=self.device), use_cache=True)
+        self._prefix_cache = (system_prompt, outputs.past_key_values)
+        return outputs.past_key_values
+
+    def _build_inputs(self, system_prompt: str, user_inputs: List[str]) -> Dict[str, Any]:
+        """Apply the chat template and tokenize the conversations.
+
+        The system prompt prefix is tokenized and prefilled once, then each call only
+        tokenizes the event part and gets a copy of the prefix past key values. Rows are
+        laid out as the prefix, left padding, then the event tokens, so the prefix sits
+        at the same positions in every row of the batch.
+        """
+        texts = [self._chat_text(system_prompt, user_input) for user_input in user_inputs]
+
+        prefix = self._prefix_for(system_prompt)
+        if prefix is None or not all(text.startswith(prefix[0]) for text in texts):
+            encoding = self.tokenizer(texts, return_tensors="pt", padding=True).to(self.device)
+            return {"input_ids": encoding.input_ids, "attention_mask": encoding.attention_mask}
+
+        prefix_text, prefix_ids = prefix
+        suffixes = self.tokenizer([text[len(prefix_text):] for text in texts], add_special_tokens=False).input_ids
+
+        length = len(prefix_ids) + max(len(suffix) for suffix in suffixes)
+        input_ids = torch.full((len(texts), length), self.tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(texts), length), dtype=torch.long)
+        input_ids[:, :len(prefix_ids)] = torch.tensor(prefix_ids)
+        attention_mask[:, :len(prefix_ids)] = 1
+        for row, suffix in enumerate(suffixes):
+            input_ids[row, length - len(suffix):] = torch.tensor(suffix)
+            attention_mask[row, length - len(suffix):] = 1
+
+        past_key_values = copy.deepcopy(self._prefix_cache_for(system_prompt, prefix_ids))
+        if len(texts) > 1:
+            past_key_values.batch_repeat_interleave(len(texts))
+
+        return {
+            "input_ids": input_ids.to(self.device),
+            "attention_mask": attention_mask.to(self.device),
+            "past_key_values": past_key_values
+        }
+
+    def _parse_output(self, output_ids: List[int]) -> dict:
+        """Decode the generated ids after the thinking block and parse the JSON answer"""
+        if self.structured_output:
+            return parse_answer(ANSWER_PREFILL + self.tokenizer.decode(output_ids, skip_special_tokens=True))
 
-        # parsing thinking content
         try:
             # rindex finding 151668 (</think>)
-            index = len(output_ids) - output_ids[::-1].index(151668)
+            index = len(output_ids) - output_ids[::-1].index(THINK_END_TOKEN_ID)
         except ValueError:
             index = 0
 
@@ -57,4 +198,182 @@ class Qwen(Model):
         if content.startswith('{{') and content.endswith('}}'):
             content = content[1:-1]
 
-        return json.loads(content)
\ No newline at end of file
+        return json.loads(content)
+
+
+    def generate(self, system_prompt: str, user_input: str) -> str:
+        """Generate a response from the LLM"""
+        if not self.is_loaded:
+            raise RuntimeError("Model must be loaded before generating. Call load() first.")
+
+        with self.profile.run():
+            model_inputs = self._build_inputs(system_prompt, [user_input])
+
+            if self.structured_output:
+                output_ids = self._decode_batch(**model_inputs)[0]
+                return self._parse_output(output_ids)
+
+            # conduct text completion
+            generated_ids = self.model.generate(
+                **model_inputs,
+                max_new_tokens=self.max_new_tokens
+            )
+            output_ids = generated_ids[0][len(model_inputs["input_ids"][0]):].tolist()
+
+        return self._parse_output(output_ids)
+
+    def generate_batch(self, system_prompt: str, user_inputs: List[str]) -> List[dict]:
+        """Generate a response for each input, decoding all of them together"""
+        if not self.is_loaded:
+            raise RuntimeError("Model must be loaded before generating. Call load() first.")
+
+        if len(user_inputs) == 1:
+            return [self.generate(system_prompt, user_inputs[0])]
+
+        with self.profile.run():
+            model_inputs = self._build_inputs(system_prompt, user_inputs)
+
+            outputs = self._decode_batch(**model_inputs)
+
+        return [self._parse_output(output_ids) for output_ids in outputs]
+
+    def _decode_batch(self, input_ids: torch.Tensor, attention_mask: torch.Tensor, past_key_values: Optional[DynamicCache] = None) -> List[List[int]]:
+        """Decode a left-padded batch, dropping rows from the KV cache as soon as they are done.
+
+        A row is done when it emits EOS or once its JSON answer is complete, so the
+        remaining steps only pay for the rows still decoding. With `past_key_values`,
+        only the tokens after the cached ones are prefilled.
+        """
+        config = self.model.generation_config
+        eos_ids = config.eos_token_id if isinstance(config.eos_token_id, list) else [config.eos_token_id]
+
+        generated = [[] for _ in range(input_ids.shape[0])]
+        # Original index of each row still in the batch
+        active = list(range(input_ids.shape[0]))
+
+        if past_key_values is not None:
+            input_ids = input_ids[:, past_key_values.get_seq_length():]
+
+        position_ids = (attention_mask.cumsum(-1) - 1).clamp(min=0)[:, -input_ids.shape[1]:]
+        outputs = self.model(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            position_ids=position_ids,
+            past_key_values=past_key_values,
+            use_cache=True
+        )
+
+        for _ in range(self.max_new_tokens):
+            next_tokens = self._sample(outputs.logits[:, -1, :], config)
+
+            keep = []
+            for row, token in enumerate(next_tokens.tolist()):
+                output_ids = generated[active[row]]
+                if token in eos_ids:
+                    continue
+                output_ids.append(token)
+                if not self._answer_complete(output_ids, token):
+                    keep.append(row)
+
+            if not keep:
+                break
+
+            if len(keep) < len(active):
+                rows = torch.tensor(keep, device=input_ids.device)
+                outputs.past_key_values.batch_select_indices(rows)
+                attention_mask = attention_mask[rows]
+                next_tokens = next_tokens[rows]
+                active = [active[row] for row in keep]
+
+            attention_mask = torch.cat([attention_mask, attention_mask.new_ones((len(active), 1))], dim=-1)
+            outputs = self.model(
+                input_ids=next_tokens[:, None],
+                attention_mask=attention_mask,
+                position_ids=attention_mask.sum(-1, keepdim=True) - 1,
+                past_key_values=outputs.past_key_values,
+                use_cache=True
+            )
+
+        return generated
+
+    def _sample(self, logits: torch.Tensor, config) -> torch.Tensor:
+        """Pick the next token of each row following the model generation config"""
+        if not config.do_sample:
+            return logits.argmax(dim=-1)
+
+        logits = logits / max(config.temperature or 1.0, 1e-5)
+
+        if config.top_k:
+            kth = torch.topk(logits, min(config.top_k, logits.shape[-1])).values[:, -1, None]
+            logits = logits.masked_fill(logits < kth, float("-inf"))
+
+        if config.top_p is not None and config.top_p < 1.0:
+            sorted_logits, sorted_indices = torch.sort(logits, descending=True)
+            probs = torch.softmax(sorted_logits, dim=-1)
+            # Keep the smallest set of tokens whose probability reaches top_p
+            sorted_logits = sorted_logits.masked_fill(probs.cumsum(-1) - probs > config.top_p, float("-inf"))
+            logits = torch.full_like(logits, float("-inf")).scatter(-1, sorted_indices, sorted_logits)
+
+        return torch.multinomial(torch.softmax(logits, dim=-1), num_samples=1).squeeze(-1)
+
+    def _answer_complete(self, output_ids: List[int], token: int) -> bool:
+        """Whether the row already produced a full JSON answer after its thinking block"""
+        if self.structured_output:
+            if '"' not in self.tokenizer.decode([token]):
+                return False
+
+            stream = AnswerSentenceStream()
+            stream.feed(ANSWER_PREFILL + self.tokenizer.decode(output_ids, skip_special_tokens=True))
+            return stream.closed
+
+        if "}" not in self.tokenizer.decode([token]):
+            return False
+        if THINK_START_TOKEN_ID in output_ids and THINK_END_TOKEN_ID not in output_ids:
+            return False
+
+        try:
+            self._parse_output(output_ids)
+            return True
+        except ValueError:
+            return False
+
+    def generate_stream(self, system_prompt: str, user_input: str) -> Iterator[str]:
+        """Yield the sentences of the answer field as soon as they are decoded"""
+        if not self.is_loaded:
+            raise RuntimeError("Model must be loaded before generating. Call load() first.")
+
+        with self.profile.run():
+            model_inputs = self._build_inputs(system_prompt, [user_input])
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        # Set once the answer string is closed, or when the consumer stops early
+        stop = Event()
+
+        def produce():
+            # Grad mode and threads are per thread, the profile applies in the decoding one
+            with self.profile.run():
+                self.model.generate(
+                    **model_inputs,
+                    max_new_tokens=self.max_new_tokens,
+                    streamer=streamer,
+                    stopping_criteria=StoppingCriteriaList([_StopWhenSet(stop)])
+                )
+
+        thread = Thread(target=produce, daemon=True)
+        thread.start()
+
+        stream = AnswerSentenceStream()
+        if self.structured_output:
+            stream.feed(ANSWER_PREFILL)
+
+        try:
+            for chunk in streamer:
+                yield from stream.feed(chunk)
+                if stream.closed:
+                    break
+            yield from stream.finish()
+        finally:
+            stop.set()
+            thread.join()
+
+        if not stream.found:
+            raise ValueError(f"No answer field in {self.model_name} output")
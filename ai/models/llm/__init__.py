@@ -1,4 +1,14 @@
-from ai.models.llm.Qwen import Qwen
-from ai.models.llm.DolphinGGUF import DolphinGGUF
+import importlib
 
-__all__ = [Qwen, DolphinGGUF]
\ No newline at end of file
+# Backends are imported on first access, importing the package stays cheap
+_BACKENDS = {
+    "Qwen": "ai.models.llm.Qwen",
+    "DolphinGGUF": "ai.models.llm.DolphinGGUF",
+}
+
+def __getattr__(name):
+    if name in _BACKENDS:
+        return getattr(importlib.import_module(_BACKENDS[name]), name)
+    raise AttributeError(f"module {__name__} has no attribute {name}")
+
+__all__ = ["Qwen", "DolphinGGUF"]
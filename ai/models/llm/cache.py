@@ -0,0 +1,115 @@
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+
+class ResponseCache:
+    """LRU cache of LLM responses with a TTL and an optional SQLite tier on disk.
+
+    Entries are keyed by model, system prompt, sampling parameters and input, so
+    switching any of them never returns a stale answer. The disk tier keeps answers
+    across restarts; entries read from it are promoted back to memory.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+
+        self._entries: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._lock = Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - ttl_seconds,))
+            self._db.commit()
+
+    @staticmethod
+    def key(model_name: str, system_prompt: str, sampling_params: Dict[str, Any], input_text: str) -> str:
+        """Stable key of a generation request"""
+        payload = json.dumps({
+            "model": model_name,
+            "system_prompt": hashlib.sha256(system_prompt.encode()).hexdigest(),
+            "sampling": sampling_params,
+            "input": input_text,
+        }, sort_keys=True, default=str)
+
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached response for the key, or None when absent or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] <= self.ttl_seconds:
+                    response = json.loads(row[0])
+                    self._remember(key, row[1], response)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return response
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, created_at, response)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(response), created_at)
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, created_at: float, response: Dict[str, Any]) -> None:
+        self._entries[key] = (created_at, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
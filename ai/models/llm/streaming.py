@@ -0,0 +1,106 @@
+import re
+from typing import List, Optional
+
+_ANSWER_START = re.compile(r'"answer"\s*:\s*"')
+_SENTENCE_END = (".", "!", "?", "…")
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class AnswerSentenceStream:
+    """Incrementally extract finished sentences from the `answer` field of a streamed JSON reply"""
+
+    def __init__(self):
+        self._raw = ""
+        self._pos: Optional[int] = None
+        self._closed = False
+        self._sentence = ""
+        self.answer = ""
+
+    @property
+    def found(self) -> bool:
+        """Whether the opening of the answer string has been seen"""
+        return self._pos is not None
+
+    @property
+    def closed(self) -> bool:
+        """Whether the closing quote of the answer string has been seen"""
+        return self._closed
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add decoded text and return the sentences completed by it"""
+        self._raw += chunk
+
+        if self._pos is None and not self._find_answer():
+            return []
+
+        sentences = []
+        while not self._closed and self._pos < len(self._raw):
+            char = self._raw[self._pos]
+
+            if char == "\\":
+                decoded, size = self._read_escape()
+                if decoded is None:
+                    # Escape sequence split across chunks, wait for the rest
+                    break
+                self._pos += size
+                self._append(decoded, sentences)
+                continue
+
+            self._pos += 1
+            if char == '"':
+                self._closed = True
+                self._flush(sentences)
+            else:
+                self._append(char, sentences)
+
+        return sentences
+
+    def finish(self) -> List[str]:
+        """Return whatever is left once the model stopped generating"""
+        sentences = []
+        self._flush(sentences)
+        return sentences
+
+    def _find_answer(self) -> bool:
+        start = 0
+        # Qwen3 reasons inside <think></think> before answering, skip it
+        if "<think>" in self._raw:
+            end = self._raw.find("</think>")
+            if end == -1:
+                return False
+            start = end + len("</think>")
+
+        match = _ANSWER_START.search(self._raw, start)
+        if match is None:
+            return False
+
+        self._pos = match.end()
+        return True
+
+    def _read_escape(self):
+        if self._pos + 1 >= len(self._raw):
+            return None, 0
+
+        code = self._raw[self._pos + 1]
+        if code == "u":
+            digits = self._raw[self._pos + 2:self._pos + 6]
+            if len(digits) < 4:
+                return None, 0
+            try:
+                return chr(int(digits, 16)), 6
+            except ValueError:
+                return digits, 6
+
+        return _ESCAPES.get(code, code), 2
+
+    def _append(self, char: str, sentences: List[str]) -> None:
+        self.answer += char
+        if char.isspace() and self._sentence.rstrip().endswith(_SENTENCE_END):
+            self._flush(sentences)
+        self._sentence += char
+
+    def _flush(self, sentences: List[str]) -> None:
+        sentence = self._sentence.strip()
+        if sentence:
+            sentences.append(sentence)
+        self._sentence = ""
@@ -0,0 +1,21 @@
+from ai.models.llm.streaming import AnswerSentenceStream
+
+# Start of the reply both backends are constrained to, the answer string follows
+ANSWER_PREFILL = '{"answer": "'
+
+# GBNF grammar of {"answer": "..."} for llama.cpp, nothing can follow the closing brace
+ANSWER_GRAMMAR = r'''
+root ::= "{" ws "\"answer\"" ws ":" ws string ws "}"
+string ::= "\"" ( [^"\\\x7F\x00-\x1F] | "\\" ( ["\\/bfnrt] | "u" [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F] [0-9a-fA-F] ) )* "\""
+ws ::= " "?
+'''
+
+
+def parse_answer(text: str) -> dict:
+    """Read the answer field of a reply, keeping what was generated if it got cut off"""
+    stream = AnswerSentenceStream()
+    stream.feed(text)
+    if not stream.found:
+        raise ValueError(f"No answer field in {text[:80]!r}")
+
+    return {"answer": stream.answer}
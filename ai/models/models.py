@@ -1,12 +1,18 @@
+import gc
 from abc import ABC, abstractmethod
-import torch
+from typing import Any, Dict, Iterator, List, Optional
+from ai.models.profile import CPUProfile
 
 
 class Model(ABC):
     """Abstract base class for all models (LLM and TTS)"""
     
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str, profile: Optional[CPUProfile] = None):
+        # Backends are instantiated when first used, so torch is only imported then
+        import torch
+
         self.model_name = model_name
+        self.profile = profile or CPUProfile()
         self.model = None
         self.tokenizer = None
         self.is_loaded = False
@@ -27,9 +33,55 @@ class Model(ABC):
             self.model = None
             self.tokenizer = None
             self.is_loaded = False
+            import torch
+
+            # Return the weights to the allocator now rather than at the next collection
+            gc.collect()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
             print(f"✅ Model unloaded: {self.model_name}")
+
+    def memory_bytes(self) -> int:
+        """Size of the loaded weights, 0 when unknown"""
+        import torch
+
+        if not isinstance(self.model, torch.nn.Module):
+            return 0
+
+        # Quantized layers keep their packed weights in the state dict, not in parameters
+        tensors = {}
+        def collect(value):
+            if isinstance(value, torch.Tensor):
+                tensors[id(value) if value.is_quantized else value.data_ptr()] = value
+            elif isinstance(value, (tuple, list)):
+                for item in value:
+                    collect(item)
+
+        for value in self.model.state_dict().values():
+            collect(value)
+
+        return sum(tensor.numel() * tensor.element_size() for tensor in tensors.values())
     
     @abstractmethod
     def generate(self, *args, **kwargs) -> str:
         """Generate output (text for LLM, audio for TTS)"""
-        pass
\ No newline at end of file
+        pass
+
+    def generate_batch(self, *args) -> List[Any]:
+        """Generate one output per element of the last argument, the leading ones are shared.
+
+        Runs one generate call per input, models able to batch override it.
+        """
+        *shared, inputs = args
+        return [self.generate(*shared, item) for item in inputs]
+
+    def sampling_params(self) -> Dict[str, Any]:
+        """Parameters changing the generated output for a given input"""
+        return {}
+
+    def generate_stream(self, *args, **kwargs) -> Iterator[str]:
+        """Generate output incrementally, yielding each finished chunk.
+
+        Yields the whole answer of `generate` at once, models able to stream override it.
+        """
+        yield self.generate(*args, **kwargs)["answer"]
\ No newline at end of file
@@ -0,0 +1,250 @@
+import argparse
+import difflib
+import io
+import math
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+
+class CPUProfile:
+    """How a torch model is prepared and run on CPU.
+
+    `quantize` swaps the linear layers for dynamically quantized int8 ones,
+    `dtype` casts the weights (bfloat16 halves memory on CPUs with AVX512-BF16 or AMX),
+    `threads` sets the intra-op threads during generation, `compile` wraps the forward
+    with torch.compile and `inference_mode` disables autograd tracking entirely.
+    """
+
+    DTYPES = ("float32", "bfloat16")
+
+    def __init__(
+        self,
+        quantize: bool = False,
+        dtype: str = "float32",
+        threads: Optional[int] = None,
+        compile: bool = False,
+        inference_mode: bool = True
+    ):
+        if dtype not in self.DTYPES:
+            raise ValueError(f"Profile dtype must be one of {', '.join(self.DTYPES)}, got {dtype}")
+        if quantize and dtype != "float32":
+            raise ValueError("Dynamic int8 quantization needs float32 weights")
+        if threads is not None and threads < 1:
+            raise ValueError(f"Profile threads must be at least 1, got {threads}")
+
+        self.quantize = quantize
+        self.dtype = dtype
+        self.threads = threads
+        self.compile = compile
+        self.inference_mode = inference_mode
+
+    @classmethod
+    def from_config(cls, value: Union[str, Dict[str, Any], None]) -> 'CPUProfile':
+        """Profile from a preset name, or options overriding the preset named in `preset`"""
+        if value is None:
+            return PROFILES["default"]
+        if isinstance(value, str):
+            if value not in PROFILES:
+                raise ValueError(f"Unknown profile {value}, available: {', '.join(PROFILES)}")
+            return PROFILES[value]
+
+        options = dict(value)
+        base = cls.from_config(options.pop("preset", "default"))
+        return CPUProfile(**{**base.as_dict(), **options})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "quantize": self.quantize,
+            "dtype": self.dtype,
+            "threads": self.threads,
+            "compile": self.compile,
+            "inference_mode": self.inference_mode,
+        }
+
+    def prepare(self, model):
+        """Apply the profile to a freshly loaded torch module, returning the module to use"""
+        import torch
+
+        model.eval()
+        if self.dtype == "bfloat16":
+            model = model.to(torch.bfloat16)
+        if self.quantize:
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        if self.compile:
+            # Sequence lengths change with every call, a dynamic graph avoids recompiling for each
+            model.forward = torch.compile(model.forward, dynamic=True)
+
+        return model
+
+    @contextmanager
+    def run(self) -> Iterator[None]:
+        """Context of a generation: no autograd and the configured thread count"""
+        import torch
+
+        previous_threads = torch.get_num_threads()
+        if self.threads is not None:
+            torch.set_num_threads(self.threads)
+        try:
+            with torch.inference_mode() if self.inference_mode else torch.no_grad():
+                yield
+        finally:
+            if self.threads is not None:
+                torch.set_num_threads(previous_threads)
+
+
+PROFILES = {
+    "default": CPUProfile(),
+    "int8": CPUProfile(quantize=True),
+    "bf16": CPUProfile(dtype="bfloat16"),
+    "compiled": CPUProfile(compile=True),
+    "int8-compiled": CPUProfile(quantize=True, compile=True),
+    "bf16-compiled": CPUProfile(dtype="bfloat16", compile=True),
+}
+
+# Commentary lines synthesized when comparing TTS profiles
+SAMPLE_TEXTS = [
+    "Quelle action incroyable, il élimine deux adversaires d'un coup !",
+    "Le baron est sécurisé, l'équipe bleue prend l'avantage.",
+    "Ace !",
+]
+
+
+def snr_db(reference, candidate) -> float:
+    """Signal to noise ratio of a clip against the reference clip, over their common length"""
+    from scipy.io import wavfile
+
+    _, reference = wavfile.read(io.BytesIO(reference.data))
+    _, candidate = wavfile.read(io.BytesIO(candidate.data))
+
+    length = min(len(reference), len(candidate))
+    reference = reference[:length].astype("float64")
+    signal = float((reference ** 2).sum())
+    noise = float(((reference - candidate[:length]) ** 2).sum())
+    if noise == 0:
+        return math.inf
+    return 10 * math.log10(signal / noise) if signal else -math.inf
+
+
+def _run(model, kind: str, system_prompt: str, inputs: List[str]) -> List[Any]:
+    import torch
+
+    outputs = []
+    for text in inputs:
+        # Same noise for every profile, so only the numerics differ
+        torch.manual_seed(0)
+        if kind == "llm":
+            outputs.append(model.generate_batch(system_prompt, [text])[0]["answer"])
+        else:
+            outputs.append(model.generate_batch([text])[0])
+    return outputs
+
+
+def compare(model_name: str, profiles: List[str], rounds: int = 3, config_path: Optional[str] = None, texts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Load a registered model under each profile and measure latency and drift from the first profile.
+
+    LLMs decode greedily so outputs are comparable; accuracy is the answer similarity.
+    TTS outputs are compared by signal to noise ratio against the reference waveform.
+    """
+    from ai.models.catalog import TORCH_BACKENDS
+    from ai.models.registry import ModelRegistry
+    from server.settings import Settings
+
+    # Models of the config catalog when there is one, the other settings of their entries apply
+    config_path = config_path or "server/config.yaml"
+    registry = ModelRegistry(catalog=Settings.from_yaml(config_path).models.catalog if os.path.exists(config_path) else None)
+    kind = "llm" if model_name in registry.llm_models else "tts"
+    factory = registry.llm_models.get(model_name) or registry.tts_models.get(model_name)
+    if factory is None:
+        raise ValueError(f"Model {model_name} not found")
+
+    backend = registry.catalog.specs[kind][model_name].backend
+    if backend not in TORCH_BACKENDS:
+        # Other backends ignore the profile options and have no greedy switch to compare with
+        raise ValueError(f"Profiles only apply to torch models, {model_name} uses the {backend} backend")
+
+    system_prompt = ""
+    inputs = texts or SAMPLE_TEXTS
+    if kind == "llm" and not texts:
+        from ai.prompts.manager import PromptManager
+
+        prompt_manager = PromptManager(config_path)
+        system_prompt = prompt_manager.get_system_prompt()
+        inputs = list(prompt_manager.get_sample_prompts().values())
+
+    results = []
+    reference = None
+    for name in profiles:
+        profile = CPUProfile.from_config(name)
+        model = factory.create(profile=profile)
+
+        start = time.perf_counter()
+        model.load()
+        load_seconds = time.perf_counter() - start
+        if kind == "llm":
+            model.model.generation_config.do_sample = False
+
+        # The first round pays for lazy initialization and compilation
+        start = time.perf_counter()
+        outputs = _run(model, kind, system_prompt, inputs)
+        first_seconds = time.perf_counter() - start
+
+        latencies = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            _run(model, kind, system_prompt, inputs)
+            latencies.append((time.perf_counter() - start) / len(inputs))
+
+        if reference is None:
+            reference = outputs
+
+        if kind == "llm":
+            accuracy = statistics.mean(
+                difflib.SequenceMatcher(None, expected, actual).ratio()
+                for expected, actual in zip(reference, outputs)
+            )
+        else:
+            accuracy = statistics.mean(
+                snr_db(expected, actual)
+                for expected, actual in zip(reference, outputs)
+            )
+
+        results.append({
+            "profile": name,
+            "metric": "similarity" if kind == "llm" else "snr_db",
+            "load_seconds": load_seconds,
+            "memory_mb": model.memory_bytes() / (1024 * 1024),
+            "first_seconds": first_seconds,
+            "latency_seconds": statistics.median(latencies),
+            "accuracy": accuracy,
+        })
+        model.unload()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CPU profiles of a model on latency and accuracy")
+    parser.add_argument("model", help="Registry name of the model, e.g. Qwen/Qwen3-0.6B or facebook/mms-tts-fra")
+    parser.add_argument("--profiles", default="default,int8,bf16", help=f"Comma separated profiles, the first is the reference (available: {', '.join(PROFILES)})")
+    parser.add_argument("--rounds", type=int, default=3, help="Measured rounds after the first one")
+    parser.add_argument("--config", "-c", default="server/config.yaml", help="Config whose model catalog and event prompts are used")
+    parser.add_argument("--text", action="append", help="Input to use instead of the defaults, repeatable")
+    args = parser.parse_args()
+
+    results = compare(args.model, args.profiles.split(","), rounds=args.rounds, config_path=args.config, texts=args.text)
+
+    reference = results[0]["latency_seconds"]
+    print(f"\n{'profile':<16}{'load s':>9}{'MB':>9}{'first s':>10}{'latency s':>11}{'speedup':>9}{results[0]['metric']:>12}")
+    for result in results:
+        print(
+            f"{result['profile']:<16}{result['load_seconds']:>9.2f}{result['memory_mb']:>9.0f}"
+            f"{result['first_seconds']:>10.3f}{result['latency_seconds']:>11.3f}"
+            f"{reference / result['latency_seconds']:>8.2f}x{result['accuracy']:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,372 @@
-from ai.models.llm.DolphinGGUF import DolphinGGUF
-from ai.models.llm.Qwen import Qwen
+import asyncio
+import importlib
+import os
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from enum import Enum
+from threading import Lock, RLock
+from typing import Any, Dict, Iterator, List, Optional
 from ai.models.models import Model
-from ai.models.tts.Facebook import FacebookMms
+from ai.models.catalog import ModelCatalog
+
+class SwitchState(Enum):
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+class ModelSwitch:
+    """Progress of a background model switch"""
+    kind: str
+    model_name: str
+    previous_model: str
+    state: SwitchState
+    started_at: datetime
+    finished_at: Optional[datetime]
+    error: Optional[str]
+
+    def __init__(self, kind: str, model_name: str, previous_model: str):
+        self.kind = kind
+        self.model_name = model_name
+        self.previous_model = previous_model
+        self.state = SwitchState.LOADING
+        self.started_at = datetime.now()
+        self.finished_at = None
+        self.error = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return ((self.finished_at or datetime.now()) - self.started_at).total_seconds()
+
+def _rss_bytes() -> int:
+    """Resident memory of the process, 0 where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+MB = 1024 * 1024
+
+class ModelFactory:
+    """Backend declared by module and class name, imported only when first instantiated.
+
+    Importing torch, transformers or llama.cpp takes seconds, so a backend never
+    used by this process never pays for it.
+    """
+
+    def __init__(self, module: str, class_name: str, *args, **kwargs):
+        self.module = module
+        self.class_name = class_name
+        self.args = args
+        self.kwargs = kwargs
+        self.import_seconds: Optional[float] = None
+
+    def create(self, **overrides) -> Model:
+        """New instance of the backend, keyword arguments override the declared ones"""
+        start = time.perf_counter()
+        backend = getattr(importlib.import_module(self.module), self.class_name)
+        if self.import_seconds is None:
+            self.import_seconds = time.perf_counter() - start
+        return backend(*self.args, **{**self.kwargs, **overrides})
+
+    def __call__(self) -> Model:
+        return self.create()
 
 class ModelRegistry:
-    """Singleton registry for managing models"""
+    """Singleton registry for managing models.
+
+    Models stay resident after use while their measured footprints fit in
+    `memory_budget_mb`, so switching back to one of them is instant. A load going
+    over the budget first unloads the least recently used idle models; the current
+    LLM and TTS are never evicted. A budget of 0 keeps only the current models.
+
+    Switching loads the new model in a worker thread while the current one keeps
+    serving, then swaps them; the old model is evicted once idle if over the budget.
+    """
+
+    # Seconds between checks that a replaced model is no longer in use
+    IDLE_POLL_SECONDS = 0.1
     
-    def __init__(self):
-        self._llm_models = {
-            "Qwen/Qwen3-0.6B": Qwen(),
-            "dphn/Dolphin-X1-8B-GGUF": DolphinGGUF(),
-            "dphn/Dolphin3.0-Llama3.1-8B-GGUF-F16": DolphinGGUF(
-                "dphn/Dolphin3.0-Llama3.1-8B-GGUF", 
-                "Dolphin3.0-Llama3.1-8B-F16.gguf"
-            ),
-            "dphn/Dolphin3.0-Llama3.1-8B-GGUF-Q8": DolphinGGUF(
-                "dphn/Dolphin3.0-Llama3.1-8B-GGUF", 
-                "Dolphin3.0-Llama3.1-8B-Q8_0.gguf"
-            ),
-            "NEO matrix 20b Q8": DolphinGGUF(
-                "DavidAU/OpenAi-GPT-oss-20b-abliterated-uncensored-NEO-Imatrix-gguf", 
-                "OpenAI-20B-NEOPlus-Uncensored-Q8_0.gguf"
-            ),
-            "HERETIC 20b Q8": DolphinGGUF(
-                "DavidAU/OpenAi-GPT-oss-20b-HERETIC-uncensored-NEO-Imatrix-gguf", 
-                "OpenAI-20B-NEOPlus-Uncensored-Q8_0.gguf"
-            ),
-        }
+    def __init__(self, memory_budget_mb: float = 0, catalog: Optional[ModelCatalog] = None):
+        self.memory_budget_bytes = int(memory_budget_mb * MB)
+        self.catalog = catalog or ModelCatalog.from_dict(None)
+
+        self._llm_models = self._factories("llm")
+        self._tts_models = self._factories("tts")
 
-        self._tts_models = {
-            "facebook/mms-tts-fra": FacebookMms(),
-            "facebook/mms-tts-eng": FacebookMms("facebook/mms-tts-eng")
+        # Registry names of the current models, loaded by preload() once the server is up
+        self._current = dict(self.catalog.current)
+        # Backends instantiated so far, by kind and registry name
+        self._instances: Dict[tuple, Model] = {}
+        self._instances_lock = Lock()
+
+        # Loaded models with their footprint in bytes, least recently used first
+        self._resident: OrderedDict[Model, int] = OrderedDict()
+        # Last measured footprint of every model loaded once, to make room before reloading it
+        self._footprints: Dict[Model, int] = {}
+        self._lock = RLock()
+        self._load_locks: Dict[Model, Lock] = {}
+        # Loads in flight and started so far, to tell when memory growth is shared
+        self._loading = 0
+        self._loads_started = 0
+
+        # Generations running on each model, a model in use is never unloaded
+        self._in_use: Counter = Counter()
+        # Last switch started for each kind of model
+        self.switches: Dict[str, ModelSwitch] = {}
+
+        # Cleared while the startup loads and warms up the current models
+        self._warmed = asyncio.Event()
+        self._warmed.set()
+        # Latency measured by the startup warmup, the steady state to compare live events with
+        self.baseline: Optional[Dict[str, Any]] = None
+
+    @property
+    def warming_up(self) -> bool:
+        return not self._warmed.is_set()
+
+    @warming_up.setter
+    def warming_up(self, value: bool) -> None:
+        if value:
+            self._warmed.clear()
+        else:
+            self._warmed.set()
+
+    async def warmed_up(self) -> None:
+        """Wait for the startup warmup to be over, the backends are not safe to share with it"""
+        await self._warmed.wait()
+
+    def _factories(self, kind: str) -> Dict[str, ModelFactory]:
+        return {
+            name: ModelFactory(spec.module, spec.class_name, spec.repo, **spec.backend_kwargs())
+            for name, spec in self.catalog.specs[kind].items()
         }
 
-        self._current_llm = self._llm_models['Qwen/Qwen3-0.6B']
-        self._current_tts = self._tts_models['facebook/mms-tts-fra']
-        
-        self._current_llm.load()
-        self._current_tts.load()
+    def settings_of(self, kind: str, model_name: Optional[str] = None) -> Dict[str, Any]:
+        """Runtime settings of the model from the catalog, the current one by default"""
+        return self.catalog.specs[kind][self.validate(kind, model_name)].as_dict()
 
     @property
-    def llm_models(self) -> dict[str, Model]:
+    def llm_models(self) -> dict[str, ModelFactory]:
         return self._llm_models
     
     @property
-    def tts_models(self) -> dict[str, Model]:
+    def tts_models(self) -> dict[str, ModelFactory]:
         return self._tts_models
-    
-    @property
-    def current_llm(self) -> Model:
-        return self._current_llm
-    
-    @current_llm.setter
-    def current_llm(self, model: Model):
-        self._current_llm = model
-    
+
+    def current_name(self, kind: str) -> str:
+        """Registry name of the current model of a kind"""
+        return self._current[kind]
+
+    def is_ready(self, kind: str, model_name: Optional[str] = None) -> bool:
+        """Whether the model, the current one by default, is loaded and can serve"""
+        if self.warming_up:
+            return False
+        model = self._instances.get((kind, model_name or self._current[kind]))
+        return model is not None and model in self._resident
+
     @property
-    def current_tts(self) -> Model:
-        return self._current_tts
-    
-    @current_tts.setter
-    def current_tts(self, model: Model):
-        self._current_tts = model
+    def resident_bytes(self) -> int:
+        return sum(self._resident.values())
+
+    def _models(self, kind: str) -> dict[str, ModelFactory]:
+        if kind == "llm":
+            return self._llm_models
+        if kind == "tts":
+            return self._tts_models
+        raise ValueError(f"Unknown model kind {kind}")
+
+    def _pinned(self) -> List[Model]:
+        return [self._instances[key] for key in self._current.items() if key in self._instances]
+
+    def name_of(self, model: Model) -> str:
+        """Registry name of the model, several names can share the same repository"""
+        for (_, name), instance in list(self._instances.items()):
+            if instance is model:
+                return name
+        return model.model_name
+
+    def validate(self, kind: str, model_name: Optional[str] = None) -> str:
+        """Registry name of the model, the current one when no name is given"""
+        if model_name is None:
+            return self._current[kind]
+
+        if model_name not in self._models(kind):
+            raise ValueError(f"Model {model_name} not found")
+        return model_name
+
+    def get(self, kind: str, model_name: Optional[str] = None) -> Model:
+        """Backend registered under the name, or the current one when no name is given.
+
+        The first call for a backend imports its module, use `instance` from the event loop.
+        """
+        model_name = self.validate(kind, model_name)
+        with self._instances_lock:
+            key = (kind, model_name)
+            if key not in self._instances:
+                self._instances[key] = self._models(kind)[model_name]()
+            return self._instances[key]
+
+    async def instance(self, kind: str, model_name: Optional[str] = None) -> Model:
+        """Backend registered under the name, imported in a worker thread on first use"""
+        model = self._instances.get((kind, self.validate(kind, model_name)))
+        if model is not None:
+            return model
+        return await asyncio.to_thread(self.get, kind, model_name)
+
+    async def preload(self, kind: str) -> Model:
+        """Load the current model of a kind, generations wait for it meanwhile"""
+        return await self.load(await self.instance(kind))
+
+    @contextmanager
+    def using(self, model: Model) -> Iterator[Model]:
+        """Mark the model as in use, so it is not unloaded underneath a generation"""
+        with self._lock:
+            self._in_use[model] += 1
+        try:
+            yield model
+        finally:
+            with self._lock:
+                self._in_use[model] -= 1
+
+    async def load(self, model: Model) -> Model:
+        """Make the model resident without blocking the event loop"""
+        # The lock is only held for bookkeeping, never while loading or unloading
+        with self._lock:
+            resident = model in self._resident
+            if resident:
+                self._resident.move_to_end(model)
+        if not resident:
+            await asyncio.to_thread(self._load, model)
+        return model
+
+    def _load(self, model: Model) -> None:
+        # Different models load concurrently, the registry lock only guards the bookkeeping
+        with self._lock:
+            model_lock = self._load_locks.setdefault(model, Lock())
+
+        with model_lock:
+            with self._lock:
+                if model in self._resident:
+                    self._resident.move_to_end(model)
+                    return
+
+            self._evict(self._footprints.get(model, 0), keep=model)
+
+            with self._lock:
+                concurrent = self._loading > 0
+                self._loading += 1
+                self._loads_started += 1
+                started = self._loads_started
+
+            try:
+                before = _rss_bytes()
+                model.load()
+                growth = _rss_bytes() - before
+            finally:
+                with self._lock:
+                    concurrent = concurrent or self._loading > 1 or self._loads_started != started
+                    self._loading -= 1
+
+            # The process grows with every load in flight, only the weight size is reliable then
+            weights = model.memory_bytes()
+            footprint = weights if concurrent and weights else max(growth, weights)
+
+            with self._lock:
+                self._footprints[model] = footprint
+                self._resident[model] = footprint
+                print(f"📦 {self.name_of(model)} resident with {footprint / MB:.0f} MB, {self.resident_bytes / MB:.0f}/{self.memory_budget_bytes / MB:.0f} MB used")
+
+            self._evict(0, keep=model)
+
+    def _evict(self, needed: int, keep: Optional[Model] = None) -> None:
+        """Unload idle models, least recently used first, until `needed` more bytes fit in the budget.
+
+        A victim leaves `_resident` under the lock before it is unloaded, so a generation
+        can no longer start on it, and its load lock is held meanwhile so a load of the
+        same model waits for the unload to finish.
+        """
+        while True:
+            with self._lock:
+                if self.resident_bytes + needed <= self.memory_budget_bytes:
+                    return
+
+                pinned = self._pinned() + [keep]
+                victim = None
+                for model in self._resident:
+                    if model in pinned or self._in_use[model]:
+                        continue
+                    model_lock = self._load_locks.setdefault(model, Lock())
+                    # A model being loaded is skipped, waiting for it could deadlock two loads
+                    if model_lock.acquire(blocking=False):
+                        victim = model
+                        break
+
+                if victim is None:
+                    return
+                del self._resident[victim]
+
+            try:
+                before = _rss_bytes()
+                victim.unload()
+                freed = max(before - _rss_bytes(), 0)
+            finally:
+                model_lock.release()
+            print(f"🧹 Evicted {self.name_of(victim)}, {freed / MB:.0f} MB freed, {self.resident_bytes / MB:.0f}/{self.memory_budget_bytes / MB:.0f} MB used")
+
+    def residency(self, kind: str) -> List[Dict[str, Any]]:
+        """Resident models of a kind with their footprint, least recently used first"""
+        names = {model: name for (model_kind, name), model in list(self._instances.items()) if model_kind == kind}
+        return [
+            {
+                "model_name": names[model],
+                "footprint_mb": footprint / MB,
+                "current": names[model] == self._current[kind],
+                "in_use": self._in_use[model] > 0,
+            }
+            for model, footprint in list(self._resident.items()) if model in names
+        ]
+
+    def start_switch(self, kind: str, model_name: str) -> ModelSwitch:
+        """Start loading a model in the background, the current one serves until it is ready"""
+        self.validate(kind, model_name)
+
+        switch = self.switches.get(kind)
+        if switch is not None and switch.state == SwitchState.LOADING:
+            raise RuntimeError(f"Already switching {kind} to {switch.model_name}")
+
+        switch = ModelSwitch(kind, model_name, self._current[kind])
+        self.switches[kind] = switch
+        switch.task = asyncio.create_task(self._switch(switch), name=f"switch-{kind}")
+
+        return switch
+
+    async def _switch(self, switch: ModelSwitch):
+        print(f"🔄 Switching {switch.kind} from {switch.previous_model} to {switch.model_name}")
+        try:
+            model = await self.load(await self.instance(switch.kind, switch.model_name))
+        except Exception as e:
+            switch.state = SwitchState.FAILED
+            switch.error = str(e)
+            switch.finished_at = datetime.now()
+            print(f"❌ Failed to load {switch.model_name}, keeping {switch.previous_model}: {e}")
+            return
+
+        previous = self._instances.get((switch.kind, self._current[switch.kind]))
+        self._current[switch.kind] = switch.model_name
+
+        switch.state = SwitchState.READY
+        switch.finished_at = datetime.now()
+        print(f"✅ Switched {switch.kind} to {switch.model_name} in {switch.elapsed_seconds:.1f}s")
+
+        if previous is None or previous is model:
+            return
+
+        while self._in_use[previous]:
+            await asyncio.sleep(self.IDLE_POLL_SECONDS)
+
+        # The previous model stays resident if it still fits in the budget
+        await asyncio.to_thread(self._evict, 0)
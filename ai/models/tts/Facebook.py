@@ -1,16 +1,16 @@
-from typing import Tuple
+from typing import List, Optional
 from ai.models.models import Model
+from ai.models.profile import CPUProfile
+from ai.models.tts.audio import AudioClip
 from transformers import AutoTokenizer, VitsModel
 import torch
-import scipy
 import numpy as np
-import uuid
 
 class FacebookMms(Model):
     """Language Model class for text generation"""
     
-    def __init__(self, model_name: str = "facebook/mms-tts-fra"):
-        super().__init__(model_name)
+    def __init__(self, model_name: str = "facebook/mms-tts-fra", profile: Optional[CPUProfile] = None):
+        super().__init__(model_name, profile)
     
     
     def load(self) -> None:
@@ -18,40 +18,45 @@ class FacebookMms(Model):
         if not self.is_loaded:
             print(f"🔄 Loading model: {self.model_name}")
             # Load model directly
-            self.model = VitsModel.from_pretrained(self.model_name).to(self.device)
+            self.model = self.profile.prepare(VitsModel.from_pretrained(self.model_name).to(self.device))
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
 
             self.is_loaded = True
             print(f"✅ Model loaded successfully: {self.model_name}")
     
-    def generate(self, user_input: str) -> Tuple[str, float]:
+    def generate(self, user_input: str) -> AudioClip:
         """Generate speech audio from text"""
+        return self.generate_batch([user_input])[0]
+
+    def generate_batch(self, user_inputs: List[str]) -> List[AudioClip]:
+        """Generate speech audio for several texts with a single padded forward pass"""
         if not self.is_loaded:
             raise RuntimeError("Model must be loaded before generating. Call load() first.")
         
-        inputs = self.tokenizer(user_input, return_tensors="pt")
+        inputs = self.tokenizer(user_inputs, return_tensors="pt", padding=True)
         # Move inputs to the same device as the model
         inputs = {k: v.to(self.device) for k, v in inputs.items()}
 
-        with torch.no_grad():
-            output = self.model(**inputs).waveform
-        
-        # Convert torch tensor to numpy array
-        audio_numpy = output.cpu().numpy()
-        
-        # Remove batch dimension if present (shape should be [samples] or [channels, samples])
-        if len(audio_numpy.shape) > 1:
-            # If shape is [1, samples] or [batch, samples], squeeze
-            audio_numpy = audio_numpy.squeeze()
-            # If still 2D and shape is [channels, samples], take first channel
-            if len(audio_numpy.shape) > 1:
-                audio_numpy = audio_numpy[0] if audio_numpy.shape[0] < audio_numpy.shape[1] else audio_numpy[:, 0]
+        with self.profile.run():
+            output = self.model(**inputs)
         
-        # Ensure audio is 1D
-        audio_numpy = audio_numpy.flatten()
+        # Convert torch tensor to numpy array, shape is [batch, samples] padded to the longest clip
+        waveforms = output.waveform.float().cpu().numpy()
+        lengths = output.sequence_lengths.cpu().tolist()
         
         # Get sampling rate (ensure it's an integer)
         sampling_rate = int(self.model.config.sampling_rate)
+
+        # Drop the padding so each clip keeps its real length
+        return [
+            AudioClip.from_samples(self._to_int16(waveform[:int(length)]), sampling_rate)
+            for waveform, length in zip(waveforms, lengths)
+        ]
+
+    def _to_int16(self, audio_numpy: np.ndarray) -> np.ndarray:
+        """Convert a waveform to the int16 samples expected in a WAV file"""
+        # Ensure audio is 1D
+        audio_numpy = audio_numpy.flatten()
         
         # Normalize audio to [-1, 1] range if needed
         if audio_numpy.dtype in [np.float32, np.float64]:
@@ -63,13 +68,4 @@ class FacebookMms(Model):
             # Convert to int16 if not already
             audio_numpy = audio_numpy.astype(np.int16)
 
-        
-        output_path = f"tts_output_{uuid.uuid4()}.wav"
-        audio_duration = len(audio_numpy) / sampling_rate
-        scipy.io.wavfile.write(
-            output_path, 
-            rate=sampling_rate, 
-            data=audio_numpy
-        )
-        
-        return output_path, audio_duration
\ No newline at end of file
+        return audio_numpy
@@ -0,0 +1,224 @@
+import argparse
+import hashlib
+import os
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+from ai.models.profile import CPUProfile, SAMPLE_TEXTS, snr_db
+from ai.models.tts.audio import AudioClip
+from ai.models.tts.Facebook import FacebookMms
+from transformers import AutoConfig, AutoTokenizer
+import numpy as np
+import onnxruntime as ort
+
+# Exported graphs, per model and config
+ONNX_DIR = "./cache/onnx"
+# Traced when exporting. Longer than the relative attention window, so the padding
+# branch taken by every real sentence is the one recorded in the graph
+EXPORT_TEXT = "Quelle action incroyable, il élimine deux adversaires d'un coup !"
+OPSET = 17
+
+class FacebookMmsOnnx(FacebookMms):
+    """MMS VITS text to speech running on ONNX Runtime.
+
+    The PyTorch model is exported once to `ONNX_DIR` and only the graph is loaded
+    afterwards. The noise scales are graph inputs, so they can still be changed,
+    or set to 0 for a deterministic waveform.
+    """
+
+    def __init__(self, model_name: str = "facebook/mms-tts-fra", profile: Optional[CPUProfile] = None):
+        super().__init__(model_name, profile)
+        if self.profile.quantize or self.profile.dtype != "float32" or self.profile.compile:
+            print(f"⚠️  {model_name}: quantize, dtype and compile do not apply to ONNX models, only threads is used")
+
+        self.onnx_path: Optional[str] = None
+        self.noise_scale: float = 0.667
+        self.noise_scale_duration: float = 0.8
+        self.sampling_rate: int = 16000
+
+    def load(self) -> None:
+        """Export the model if needed and open an inference session on it"""
+        if not self.is_loaded:
+            print(f"🔄 Loading model: {self.model_name}")
+            config = AutoConfig.from_pretrained(self.model_name)
+            self.noise_scale = config.noise_scale
+            self.noise_scale_duration = config.noise_scale_duration
+            self.sampling_rate = int(config.sampling_rate)
+
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self.onnx_path = self._export(config)
+            self.model = ort.InferenceSession(self.onnx_path, self._session_options(), providers=["CPUExecutionProvider"])
+
+            self.is_loaded = True
+            print(f"✅ Model loaded successfully: {self.model_name}")
+
+    def _session_options(self) -> ort.SessionOptions:
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = self.profile.threads or os.cpu_count() or 1
+        options.inter_op_num_threads = 1
+        # Idle workers sleep between clips instead of spinning on the cores the LLM needs
+        options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+        return options
+
+    def _export(self, config) -> str:
+        """Path of the exported graph, exporting it on first use"""
+        digest = hashlib.sha256(f"{config.to_json_string()}\n{OPSET}".encode()).hexdigest()[:12]
+        path = os.path.join(ONNX_DIR, f"{self.model_name.replace('/', '--')}-{digest}.onnx")
+        if os.path.exists(path):
+            print(f"ONNX export of {self.model_name} already cached")
+            return path
+
+        import torch
+        from transformers import VitsModel
+
+        class Exportable(torch.nn.Module):
+            def __init__(self, model: VitsModel):
+                super().__init__()
+                self.model = model
+
+            def forward(self, input_ids, attention_mask, noise_scale, noise_scale_duration):
+                # Traced as tensors, the scales become inputs of the graph instead of constants
+                self.model.noise_scale = noise_scale
+                self.model.noise_scale_duration = noise_scale_duration
+                output = self.model(input_ids=input_ids, attention_mask=attention_mask)
+                return output.waveform, output.sequence_lengths
+
+        print(f"📦 Exporting {self.model_name} to ONNX...")
+        start = time.perf_counter()
+        module = Exportable(VitsModel.from_pretrained(self.model_name)).eval()
+        inputs = self.tokenizer([EXPORT_TEXT], return_tensors="pt")
+
+        os.makedirs(ONNX_DIR, exist_ok=True)
+        # Written aside then renamed, an interrupted export never leaves a truncated graph
+        partial_path = f"{path}.partial"
+        with torch.inference_mode():
+            torch.onnx.export(
+                module,
+                (inputs["input_ids"], inputs["attention_mask"], torch.tensor(self.noise_scale), torch.tensor(self.noise_scale_duration)),
+                partial_path,
+                dynamo=False,
+                opset_version=OPSET,
+                input_names=["input_ids", "attention_mask", "noise_scale", "noise_scale_duration"],
+                output_names=["waveform", "sequence_lengths"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "tokens"},
+                    "attention_mask": {0: "batch", 1: "tokens"},
+                    "waveform": {0: "batch", 1: "samples"},
+                    "sequence_lengths": {0: "batch"},
+                }
+            )
+        os.replace(partial_path, path)
+        print(f"✅ Exported {self.model_name} in {time.perf_counter() - start:.1f}s: {path}")
+        return path
+
+    def generate_batch(self, user_inputs: List[str]) -> List[AudioClip]:
+        """Generate speech audio for several texts with a single padded run of the graph"""
+        if not self.is_loaded:
+            raise RuntimeError("Model must be loaded before generating. Call load() first.")
+
+        inputs = self.tokenizer(user_inputs, return_tensors="np", padding=True)
+        waveforms, lengths = self.model.run(None, {
+            "input_ids": inputs["input_ids"].astype(np.int64),
+            "attention_mask": inputs["attention_mask"].astype(np.int64),
+            "noise_scale": np.array(self.noise_scale, dtype=np.float32),
+            "noise_scale_duration": np.array(self.noise_scale_duration, dtype=np.float32),
+        })
+
+        # Drop the padding so each clip keeps its real length
+        return [
+            AudioClip.from_samples(self._to_int16(waveform[:int(length)]), self.sampling_rate)
+            for waveform, length in zip(waveforms, lengths)
+        ]
+
+    def memory_bytes(self) -> int:
+        """Size of the exported graph, which holds the weights"""
+        if not self.is_loaded or self.onnx_path is None:
+            return 0
+        return os.path.getsize(self.onnx_path)
+
+
+def _real_time_factor(model: FacebookMms, texts: List[str], rounds: int) -> float:
+    """Median seconds of synthesis per second of audio, one clip at a time like live events"""
+    factors = []
+    for _ in range(rounds):
+        synthesis_seconds = 0.0
+        audio_seconds = 0.0
+        for text in texts:
+            start = time.perf_counter()
+            clip = model.generate(text)
+            synthesis_seconds += time.perf_counter() - start
+            audio_seconds += clip.duration
+        factors.append(synthesis_seconds / audio_seconds)
+    return statistics.median(factors)
+
+
+def compare(model_name: str, texts: Optional[List[str]] = None, rounds: int = 5, threads: Optional[int] = None) -> Dict[str, Any]:
+    """Waveform parity of the ONNX backend against PyTorch, and the real-time factor of both.
+
+    Parity is measured with the noise scales at 0, where both backends are deterministic.
+    """
+    import torch
+
+    texts = texts or SAMPLE_TEXTS
+    profile = CPUProfile(threads=threads)
+    reference = FacebookMms(model_name, profile)
+    candidate = FacebookMmsOnnx(model_name, profile)
+    reference.load()
+    candidate.load()
+
+    reference.model.noise_scale = reference.model.noise_scale_duration = 0
+    candidate.noise_scale = candidate.noise_scale_duration = 0
+    parity = []
+    for text in texts:
+        expected = reference.generate(text)
+        actual = candidate.generate(text)
+        parity.append({
+            "text": text,
+            "snr_db": snr_db(expected, actual),
+            "duration_delta": actual.duration - expected.duration,
+        })
+
+    reference.model.noise_scale = reference.model.config.noise_scale
+    reference.model.noise_scale_duration = reference.model.config.noise_scale_duration
+    candidate.noise_scale = reference.model.config.noise_scale
+    candidate.noise_scale_duration = reference.model.config.noise_scale_duration
+
+    # The first calls initialize kernels and allocators on both sides
+    _real_time_factor(reference, texts, 1)
+    _real_time_factor(candidate, texts, 1)
+    results = {
+        "model_name": model_name,
+        "threads": threads or torch.get_num_threads(),
+        "parity": parity,
+        "pytorch_rtf": _real_time_factor(reference, texts, rounds),
+        "onnx_rtf": _real_time_factor(candidate, texts, rounds),
+    }
+
+    reference.unload()
+    candidate.unload()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the ONNX MMS backend against PyTorch and compare their real-time factor")
+    parser.add_argument("model", nargs="?", default="facebook/mms-tts-fra", help="Hugging Face name of the MMS model")
+    parser.add_argument("--rounds", type=int, default=5, help="Measured rounds after the first one")
+    parser.add_argument("--threads", type=int, help="Intra-op threads of both backends, all cores by default")
+    parser.add_argument("--text", action="append", help="Text to synthesize instead of the defaults, repeatable")
+    args = parser.parse_args()
+
+    results = compare(args.model, texts=args.text, rounds=args.rounds, threads=args.threads)
+
+    print(f"\nParity with PyTorch, noise disabled ({results['model_name']})")
+    for sample in results["parity"]:
+        print(f"   {sample['snr_db']:8.1f} dB  {sample['duration_delta']:+.3f}s  {sample['text']}")
+
+    print(f"\nReal-time factor, {results['threads']} threads (lower is faster)")
+    print(f"   pytorch  {results['pytorch_rtf']:.4f}")
+    print(f"   onnx     {results['onnx_rtf']:.4f}  ({results['pytorch_rtf'] / results['onnx_rtf']:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,15 @@
-from ai.models.tts.Facebook import FacebookMms
+import importlib
+from ai.models.tts.audio import AudioClip
 
-__all__ = ["FacebookMms"]
\ No newline at end of file
+# Backends are imported on first access, importing the package stays cheap
+_BACKENDS = {
+    "FacebookMms": "ai.models.tts.Facebook",
+    "FacebookMmsOnnx": "ai.models.tts.FacebookOnnx",
+}
+
+def __getattr__(name):
+    if name in _BACKENDS:
+        return getattr(importlib.import_module(_BACKENDS[name]), name)
+    raise AttributeError(f"module {__name__} has no attribute {name}")
+
+__all__ = ["FacebookMms", "FacebookMmsOnnx", "AudioClip"]
@@ -0,0 +1,46 @@
+import io
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class AudioClip:
+    """WAV encoded speech kept in memory"""
+    data: bytes
+    sampling_rate: int
+    duration: float
+    content_type: str = "audio/wav"
+
+    def __init__(self, data: bytes, sampling_rate: int, duration: float):
+        self.data = data
+        self.sampling_rate = sampling_rate
+        self.duration = duration
+
+    @classmethod
+    def from_samples(cls, samples: 'np.ndarray', sampling_rate: int) -> 'AudioClip':
+        """Encode int16 samples into an in-memory WAV file"""
+        import scipy.io.wavfile
+
+        buffer = io.BytesIO()
+        scipy.io.wavfile.write(buffer, rate=sampling_rate, data=samples)
+
+        return AudioClip(
+            data=buffer.getvalue(),
+            sampling_rate=sampling_rate,
+            duration=len(samples) / sampling_rate
+        )
+
+    @classmethod
+    def concatenate(cls, clips: List['AudioClip']) -> 'AudioClip':
+        """Join clips sharing a sampling rate into a single one"""
+        import numpy as np
+        import scipy.io.wavfile
+
+        samples = [scipy.io.wavfile.read(io.BytesIO(clip.data))[1] for clip in clips]
+        return cls.from_samples(np.concatenate(samples), clips[0].sampling_rate)
+
+    def save(self, path: str) -> None:
+        """Write a copy of the clip to disk"""
+        with open(path, 'wb') as f:
+            f.write(self.data)
@@ -0,0 +1,100 @@
+import hashlib
+import sqlite3
+import time
+import unicodedata
+from threading import Lock
+from typing import Dict, Iterable, Optional
+
+
+class CachedAudio:
+    """Uploaded clip of an already synthesized text"""
+    audio_url: str
+    audio_duration: float
+
+    def __init__(self, audio_url: str, audio_duration: float):
+        self.audio_url = audio_url
+        self.audio_duration = audio_duration
+
+
+class AudioCache:
+    """Index of uploaded clips, keyed by TTS model and normalized text.
+
+    The key also names the uploaded object, so the same text is never stored twice.
+    The index lives in SQLite, on disk when `path` is set so it survives restarts,
+    and keeps the `max_entries` most recently used clips.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+
+        self._lock = Lock()
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS clips (key TEXT PRIMARY KEY, audio_url TEXT NOT NULL, audio_duration REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS clips_last_used ON clips (last_used)")
+        self._db.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model_name: str, text: str) -> str:
+        """Content address of the clip synthesized by the model for the text"""
+        normalized = " ".join(unicodedata.normalize("NFC", text).split())
+        return hashlib.sha256(f"{model_name}\n{normalized}".encode()).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, CachedAudio]:
+        """Cached clips of the given keys, absent keys are left out"""
+        requested = list(keys)
+        keys = list(dict.fromkeys(requested))
+        if not keys:
+            return {}
+
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT key, audio_url, audio_duration FROM clips WHERE key IN ({','.join('?' * len(keys))})",
+                keys
+            ).fetchall()
+
+            found = {key: CachedAudio(audio_url, audio_duration) for key, audio_url, audio_duration in rows}
+            if found:
+                now = time.time()
+                self._db.executemany("UPDATE clips SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+                self._db.commit()
+
+            hits = sum(key in found for key in requested)
+            self.hits += hits
+            self.misses += len(requested) - hits
+            return found
+
+    def put(self, key: str, audio_url: str, audio_duration: float) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO clips (key, audio_url, audio_duration, last_used) VALUES (?, ?, ?, ?)",
+                (key, audio_url, audio_duration, time.time())
+            )
+            # Least recently used clips leave the index, their objects are simply no longer reused
+            self._db.execute(
+                "DELETE FROM clips WHERE key IN (SELECT key FROM clips ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._db.commit()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM clips").fetchone()[0]
+
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
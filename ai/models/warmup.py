@@ -0,0 +1,89 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from ai.models.models import Model
+
+
+class WarmupSample:
+    """Latency of one representative event through the LLM and the TTS"""
+    event_name: str
+    llm_seconds: float
+    tts_seconds: float
+    audio_seconds: float
+
+    def __init__(self, event_name: str, llm_seconds: float, tts_seconds: float, audio_seconds: float):
+        self.event_name = event_name
+        self.llm_seconds = llm_seconds
+        self.tts_seconds = tts_seconds
+        self.audio_seconds = audio_seconds
+
+
+class Warmup:
+    """Runs representative prompts through freshly loaded models before they serve.
+
+    The first calls pay for lazy kernel initialization, allocator growth and
+    tokenizer caches. Only the rounds after the first are kept as the baseline
+    latency, so it reflects the steady state live events should see.
+    """
+
+    def __init__(self, llm: Model, tts: Model, system_prompt: str, prompts: Dict[str, str], rounds: int = 2, streaming: bool = False):
+        self.llm = llm
+        self.tts = tts
+        self.system_prompt = system_prompt
+        self.prompts = prompts
+        self.rounds = rounds
+        self.streaming = streaming
+
+        self.first: List[WarmupSample] = []
+        self.baseline: List[WarmupSample] = []
+        self.seconds: Optional[float] = None
+
+    def run(self) -> 'Warmup':
+        """Run every round, blocking, call it from a worker thread"""
+        start = time.perf_counter()
+        for index in range(self.rounds):
+            samples = [self._sample(event_name, prompt) for event_name, prompt in self.prompts.items()]
+            if index == 0:
+                self.first = samples
+            if index > 0 or self.rounds == 1:
+                self.baseline.extend(samples)
+
+        self.seconds = time.perf_counter() - start
+        return self
+
+    def _sample(self, event_name: str, prompt: str) -> WarmupSample:
+        # Same calls as the pipeline for a single event, without the caches
+        start = time.perf_counter()
+        if self.streaming:
+            text = " ".join(self.llm.generate_stream(self.system_prompt, prompt))
+        else:
+            text = self.llm.generate_batch(self.system_prompt, [prompt])[0]["answer"]
+        llm_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        clip = self.tts.generate_batch([text or event_name])[0]
+        tts_seconds = time.perf_counter() - start
+
+        return WarmupSample(event_name, llm_seconds, tts_seconds, clip.duration)
+
+    def summary(self) -> Dict[str, Any]:
+        """Baseline latency per event type, averaged over the measured rounds"""
+        events: Dict[str, Dict[str, float]] = {}
+        for event_name in self.prompts:
+            samples = [sample for sample in self.baseline if sample.event_name == event_name]
+            first = next(sample for sample in self.first if sample.event_name == event_name)
+            events[event_name] = {
+                "llm_seconds": sum(sample.llm_seconds for sample in samples) / len(samples),
+                "tts_seconds": sum(sample.tts_seconds for sample in samples) / len(samples),
+                "audio_seconds": sum(sample.audio_seconds for sample in samples) / len(samples),
+                "first_llm_seconds": first.llm_seconds,
+                "first_tts_seconds": first.tts_seconds,
+            }
+
+        return {
+            "llm_model": self.llm.model_name,
+            "tts_model": self.tts.model_name,
+            "rounds": self.rounds,
+            "seconds": self.seconds,
+            "events": events,
+        }
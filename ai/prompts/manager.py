@@ -1,19 +1,92 @@
+import asyncio
+import os
+import re
 import yaml
-from typing import Optional, Dict, Any
+from database.models import EXPIRY_ACTIONS
+from string import Formatter
+from typing import Optional, Dict, Any, FrozenSet, List, Tuple
 
-class EventPrompt:
+# Prompt of coalesced events, {events} lists the prompt of each event and {count} their number
+DEFAULT_COMPOSITE_PROMPT = (
+    "Plusieurs actions viennent de s'enchaîner ({count}) :\n"
+    "{events}\n"
+    "Commente-les ensemble en une seule réplique."
+)
+COMPOSITE_FIELDS = frozenset({"events", "count"})
+
+class PromptTemplate:
+    """Template parsed once at load, rendering by joining its parts"""
     template: str
+    required_fields: FrozenSet[str]
 
     def __init__(self, template: str):
         self.template = template
 
+        # Literal text followed by the field rendered after it, if any
+        self._parts: List[Tuple[str, Optional[str]]] = []
+        fields = set()
+        simple = True
+        for literal, field, spec, conversion in Formatter().parse(template):
+            if field is not None:
+                if field == "" or field.isdigit():
+                    raise ValueError(f"Template fields must be named: {template!r}")
+                fields.add(re.split(r"[.\[]", field, maxsplit=1)[0])
+                simple = simple and field.isidentifier() and not spec and conversion is None
+            self._parts.append((literal, field))
+
+        self.required_fields = frozenset(fields)
+        # Fields with attribute access, conversions or format specs go through str.format
+        self._simple = simple
+
+    def render(self, data: Dict[str, Any]) -> str:
+        missing = self.required_fields - data.keys()
+        if missing:
+            raise ValueError(f"Variable manquante dans event_data: {', '.join(sorted(missing))}")
+
+        if not self._simple:
+            return self.template.format_map(data)
+
+        return "".join(
+            literal if field is None else literal + str(data[field])
+            for literal, field in self._parts
+        )
+
+class EventPrompt:
+    template: PromptTemplate
+    cache: bool
+    # Scheduling of the event jobs, None keeps the scheduler defaults
+    priority: Optional[int]
+    deadline: Optional[float]
+    on_expiry: Optional[str]
+
+    def __init__(self, template: str, cache: bool = True, priority: Optional[int] = None, deadline: Optional[float] = None, on_expiry: Optional[str] = None):
+        if priority is not None and not isinstance(priority, int):
+            raise ValueError(f"priority must be an integer, got {priority!r}")
+        if deadline is not None and deadline < 0:
+            raise ValueError(f"deadline must be positive, got {deadline}")
+        if on_expiry is not None and on_expiry not in EXPIRY_ACTIONS:
+            raise ValueError(f"on_expiry must be one of {', '.join(EXPIRY_ACTIONS)}, got {on_expiry}")
+
+        self.template = PromptTemplate(template)
+        self.cache = cache
+        self.priority = priority
+        self.deadline = deadline
+        self.on_expiry = on_expiry
+
 class PromptConfig:
     system_prompt: str
     event_prompts: Optional[Dict[str, EventPrompt]] = None
+    composite_prompt: PromptTemplate
+
+    def __init__(self, system_prompt: str, event_prompts: Optional[Dict[str, EventPrompt]] = None, composite_prompt: Optional[str] = None):
+        composite = PromptTemplate(composite_prompt or DEFAULT_COMPOSITE_PROMPT)
+        unknown = composite.required_fields - COMPOSITE_FIELDS
+        if unknown:
+            raise ValueError(f"composite_prompt only provides {', '.join(sorted(COMPOSITE_FIELDS))}, not {', '.join(sorted(unknown))}")
 
-    def __init__(self, system_prompt: str, event_prompts: Optional[Dict[str, EventPrompt]] = None):
         self.system_prompt = system_prompt
         self.event_prompts = event_prompts
+        self.composite_prompt = composite
 
     @classmethod
     def from_yaml(cls, yaml_path: str) -> 'PromptConfig':
@@ -21,39 +94,145 @@ class PromptConfig:
         with open(yaml_path, 'r', encoding='utf-8') as f:
             data = yaml.safe_load(f)
 
+            if not isinstance(data.get("system_prompt"), str):
+                raise ValueError("system_prompt must be a string")
+
             event_prompts = {}
             for event_name, event_prompt in data["event_prompts"].items():
-                event_prompts[event_name] = EventPrompt(template=event_prompt["template"])
+                if not isinstance(event_prompt.get("template"), str):
+                    raise ValueError(f"Template of {event_name} must be a string")
+
+                try:
+                    event_prompts[event_name] = EventPrompt(
+                        template=event_prompt["template"],
+                        cache=event_prompt.get("cache", True),
+                        priority=event_prompt.get("priority"),
+                        deadline=event_prompt.get("deadline"),
+                        on_expiry=event_prompt.get("on_expiry")
+                    )
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"Invalid prompt for {event_name}: {e}")
+
+            composite_prompt = data.get("composite_prompt")
+            if composite_prompt is not None and not isinstance(composite_prompt, str):
+                raise ValueError("composite_prompt must be a string")
 
             return PromptConfig(
                 system_prompt=data["system_prompt"],
-                event_prompts=event_prompts
+                event_prompts=event_prompts,
+                composite_prompt=composite_prompt
             )
      
 class PromptManager:
+    """Serves prompts of the config file, reloading them when the file changes.
+
+    A reload builds and validates a whole new PromptConfig before swapping it in, so
+    callers always see either the old prompts or the new ones, never a mix, and a
+    broken edit keeps the previous prompts.
+    """
+
     def __init__(self, config_path: str):
         self.config_path = config_path
+        self._mtime = os.path.getmtime(config_path)
         self.config = self._load_config()
+        self.reloads = 0
 
     def _load_config(self):
         """Load YAML config and convert to Python object"""
         return PromptConfig.from_yaml(self.config_path)
 
+    def reload(self) -> bool:
+        """Reload the prompts if the config file changed since the last load"""
+        mtime = os.path.getmtime(self.config_path)
+        if mtime == self._mtime:
+            return False
+
+        self._mtime = mtime
+        try:
+            config = self._load_config()
+        except (OSError, ValueError, KeyError, AttributeError, yaml.YAMLError) as e:
+            print(f"❌ Prompts not reloaded, keeping the previous ones: {e}")
+            return False
+
+        self.config = config
+        self.reloads += 1
+        print(f"📝 Prompts reloaded from {self.config_path}")
+        return True
+
+    async def watch(self, interval: float = 2.0):
+        """Reload the prompts whenever the config file changes"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.reload)
+            except OSError as e:
+                print(f"⚠️  Cannot check {self.config_path}: {e}")
+
     def get_system_prompt(self) -> str:
         return self.config.system_prompt
     
+    def is_cacheable(self, event_name: str) -> bool:
+        """Whether generations for this event type may be answered from the response cache"""
+        event_prompt = self.config.event_prompts.get(event_name)
+        return event_prompt is None or event_prompt.cache
+
+    def get_schedule(self, event_name: str) -> Tuple[Optional[int], Optional[float], Optional[str]]:
+        """Priority, deadline in seconds and expiry action of the event type, None when not configured"""
+        event_prompt = self.config.event_prompts.get(event_name)
+        if event_prompt is None:
+            return None, None, None
+        return event_prompt.priority, event_prompt.deadline, event_prompt.on_expiry
+
+    def get_event_names(self) -> List[str]:
+        """Event types having a prompt"""
+        return list(self.config.event_prompts or {})
+
+    def get_sample_prompts(self, event_data: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, str]:
+        """Representative prompt per event type, rendered with the given data.
+
+        Every event type is used when no data is given, and fields without sample
+        data are filled with their own name.
+        """
+        prompts = {}
+        for event_name in event_data or self.get_event_names():
+            if event_name not in self.get_event_names():
+                print(f"⚠️  No prompt for sample event {event_name}, skipping it")
+                continue
+
+            data = {field: field for field in self.get_required_fields(event_name)}
+            data.update((event_data or {}).get(event_name) or {})
+            prompts[event_name] = self.get_prompt(event_name, data)
+
+        return prompts
+
+    def get_required_fields(self, event_name: str) -> FrozenSet[str]:
+        """Fields the event data must provide to render the prompt"""
+        return self._event_prompt(event_name).template.required_fields
+
     def get_prompt(self, event_name: str, event_data: Optional[Dict[str, Any]] = None) -> str:
-        """Get prompt template, optionally with variables replaced"""
-        template = self.config.event_prompts[event_name].template
-        
-        # Si event_data est fourni, remplacer les variables
-        if event_data:
-            try:
-                return template.format(**event_data)
-            except KeyError as e:
-                raise ValueError(f"Variable manquante dans event_data: {e}")
-        
-        return template
+        """Render the prompt of the event with its data"""
+        template = self._event_prompt(event_name).template
+
+        try:
+            return template.render(event_data or {})
+        except (KeyError, AttributeError, IndexError) as e:
+            raise ValueError(f"Variable manquante dans event_data: {e}")
+
+    def get_composite_prompt(self, events: List[Tuple[str, Optional[Dict[str, Any]]]]) -> str:
+        """Render a single prompt for several events, from the prompt of each of them"""
+        if len(events) == 1:
+            return self.get_prompt(*events[0])
+
+        lines = "\n".join(f"- {self.get_prompt(event_name, event_data)}" for event_name, event_data in events)
+        return self.config.composite_prompt.render({"events": lines, "count": len(events)})
+
+    def _event_prompt(self, event_name: str) -> EventPrompt:
+        event_prompt = self.config.event_prompts.get(event_name)
+        if event_prompt is None:
+            raise ValueError(f"No prompt for event type {event_name}")
+
+        return event_prompt
+
 if __name__ == "__main__":
     
     manager = PromptManager("config.yaml")
@@ -1,25 +1,66 @@
+import asyncio
 import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
 import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple
+from psycopg2.pool import ThreadedConnectionPool
 from database.models import ProcessingRiotEventJob, RiotEvent
 from datetime import datetime
 
+# Server-side prepared statements, created once on every pooled connection
+STATEMENTS = {
+    "get_riot_events_by_ids": "SELECT * FROM riot_events WHERE id = ANY($1)",
+}
+
+def array_literal(values: List[str]) -> str:
+    """Untyped array literal, so Postgres casts it to the column type (uuid[] or text[])"""
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"') for value in values)
+    return "{" + ",".join(f'"{value}"' for value in escaped) + "}"
+
+def _to_riot_event(result) -> RiotEvent:
+    return RiotEvent(
+        id=str(result[0]),
+        gameSessionId=result[1],
+        riotEventId=result[2],
+        eventName=result[3],
+        eventData=result[4],
+        createdAt=result[5]
+    )
+
+class PooledConnection(psycopg2.extensions.connection):
+    """Connection remembering whether its statements are prepared and when it was last used"""
+    prepared = False
+    last_used = 0.0
+
 class Database:
-    def __init__(self):
+    """Connection pool whose queries run in worker threads, off the event loop"""
+
+    # Connections idle for longer are pinged before being handed out
+    IDLE_CHECK_SECONDS = 30
+
+    def __init__(self, min_connections: int = 1, max_connections: int = 10):
 
         print("🐟 Initializing Database")
         host, port, user, password, database = self._load_env()
 
-        self.conn = psycopg2.connect(
+        self.pool = ThreadedConnectionPool(
+            min_connections,
+            max_connections,
             host=host,
             port=port,
             user=user,
             password=password,
-            database=database
+            database=database,
+            connection_factory=PooledConnection
         )
+        # getconn raises once every connection is checked out, callers wait for a slot instead
+        self._slots = threading.BoundedSemaphore(max_connections)
 
-        self.cursor = self.conn.cursor()
-
-        print("🐟 Database initialized")
+        print(f"🐟 Database initialized with a pool of {min_connections}-{max_connections} connections")
 
     def _load_env(self):
         host = os.getenv("DIGITAL_OCEAN_DATABASE_HOST")
@@ -41,66 +82,128 @@ class Database:
 
         return host, port, user, password, database
 
-    def get_riot_event_by_id(self, riot_event_id: str) -> RiotEvent:
-        self.cursor.execute(
-            "SELECT * FROM riot_events WHERE id = %s",
-            (riot_event_id,)
-        )
-        result = self.cursor.fetchone()
-        if result:
-            return RiotEvent(
-                id=result[0],
-                gameSessionId=result[1],
-                riotEventId=result[2],
-                eventName=result[3],
-                eventData=result[4],
-                createdAt=result[5]
-            )
+    @contextmanager
+    def _connection(self):
+        """Borrow a healthy connection, committing on success and rolling back on error"""
+        self._slots.acquire()
+        try:
+            conn = self.pool.getconn()
+        except BaseException:
+            self._slots.release()
+            raise
+
+        try:
+            if not conn.closed and conn.last_used and time.monotonic() - conn.last_used > self.IDLE_CHECK_SECONDS:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+
+            if not conn.prepared:
+                self._prepare(conn)
+
+            yield conn
+            conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            # Broken connection, the pool opens a fresh one on the next checkout
+            self.pool.putconn(conn, close=True)
+            conn = None
+            raise
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            try:
+                if conn is not None:
+                    conn.last_used = time.monotonic()
+                    self.pool.putconn(conn)
+            finally:
+                self._slots.release()
+
+    def _prepare(self, conn: PooledConnection):
+        with conn.cursor() as cursor:
+            for name, query in STATEMENTS.items():
+                cursor.execute(f"PREPARE {name} AS {query}")
+        conn.commit()
+        conn.prepared = True
+
+    def _run(self, query, *args):
+        """Run a query function with a pooled cursor, retrying once if the connection dropped.
 
-    def save_processing_riot_event_job(self, processing_riot_event_job: ProcessingRiotEventJob):
-        
-        processing_riot_event_job.updated_at = datetime.now()
+        The drop may happen after the commit went through, query functions must be safe to run twice.
+        """
+        for attempt in range(2):
+            try:
+                with self._connection() as conn, conn.cursor() as cursor:
+                    return query(cursor, *args)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                if attempt == 1:
+                    raise
+                print(f"⚠️  Database connection lost ({e}), reconnecting")
 
-        self.cursor.execute(
-            "INSERT INTO processing_riot_events_jobs (id, riot_event_id, status, input_text, created_at, updated_at) VALUES (%s, %s, %s, %s, %s, %s)",
-            (processing_riot_event_job.id, processing_riot_event_job.riot_event_id, processing_riot_event_job.status.value, processing_riot_event_job.input_text, processing_riot_event_job.created_at, processing_riot_event_job.updated_at)
+    async def ping(self) -> bool:
+        """Check that the database answers"""
+        try:
+            await asyncio.to_thread(self._run, lambda cursor: cursor.execute("SELECT 1"))
+            return True
+        except psycopg2.Error:
+            return False
+
+    def close(self):
+        self.pool.closeall()
+
+    async def get_riot_events_by_ids(self, riot_event_ids: List[str]) -> Dict[str, RiotEvent]:
+        """Fetch several riot events in one query, keyed by id. Unknown ids are absent."""
+        return await asyncio.to_thread(self._run, self._get_riot_events_by_ids, riot_event_ids)
+
+    def _get_riot_events_by_ids(self, cursor, riot_event_ids: List[str]) -> Dict[str, RiotEvent]:
+        cursor.execute(
+            "EXECUTE get_riot_events_by_ids (%s)",
+            (array_literal(riot_event_ids),)
         )
-        self.conn.commit()
-
-        return processing_riot_event_job
-
-
-    def update_processing_riot_events_job(self, processing_riot_event_job: ProcessingRiotEventJob):
-        
-        processing_riot_event_job.updated_at = datetime.now()
-        
-        self.cursor.execute(
-            """
-                UPDATE processing_riot_events_jobs SET riot_event_id = %s,
-                status = %s, input_text = %s, llm_started_at = %s, llm_completed_at = %s,
-                llm_model_name = %s, llm_text = %s, error_message = %s, tts_started_at = %s,
-                tts_completed_at = %s, tts_model_name = %s, audio_url = %s,
-                audio_duration = %s, updated_at = %s
-                WHERE id = %s;
-            """,
-            (
-                processing_riot_event_job.riot_event_id,
-                processing_riot_event_job.status.value,
-                processing_riot_event_job.input_text,
-                processing_riot_event_job.llm_started_at,
-                processing_riot_event_job.llm_completed_at,
-                processing_riot_event_job.llm_model_name,
-                processing_riot_event_job.llm_text,
-                processing_riot_event_job.error_message,
-                processing_riot_event_job.tts_started_at,
-                processing_riot_event_job.tts_completed_at,
-                processing_riot_event_job.tts_model_name,
-                processing_riot_event_job.audio_url,
-                processing_riot_event_job.audio_duration,
-                processing_riot_event_job.updated_at,
-                processing_riot_event_job.id
-            )
+        riot_events = (_to_riot_event(result) for result in cursor.fetchall())
+        return {riot_event.id: riot_event for riot_event in riot_events}
+
+    async def save_processing_riot_event_jobs(self, processing_riot_event_jobs: List[ProcessingRiotEventJob]):
+        """Insert several jobs with one multi-row INSERT inside a single transaction"""
+        return await asyncio.to_thread(self._run, self._save_processing_riot_event_jobs, processing_riot_event_jobs)
+
+    def _save_processing_riot_event_jobs(self, cursor, processing_riot_event_jobs: List[ProcessingRiotEventJob]):
+
+        updated_at = datetime.now()
+        for processing_riot_event_job in processing_riot_event_jobs:
+            processing_riot_event_job.updated_at = updated_at
+
+        # `_run` may retry after a commit whose acknowledgement was lost, rows already inserted are kept
+        psycopg2.extras.execute_values(
+            cursor,
+            "INSERT INTO processing_riot_events_jobs (id, riot_event_id, riot_event_ids, status, input_text, created_at, updated_at) VALUES %s ON CONFLICT (id) DO NOTHING",
+            [
+                (job.id, job.riot_event_id, array_literal(job.riot_event_ids or [job.riot_event_id]), job.status.value, job.input_text, job.created_at, job.updated_at)
+                for job in processing_riot_event_jobs
+            ],
+            page_size=max(1, len(processing_riot_event_jobs))
         )
-        self.conn.commit()
 
-        return processing_riot_event_job
\ No newline at end of file
+        return processing_riot_event_jobs
+
+    async def update_processing_riot_events_jobs(self, changes: List[Tuple[str, Dict[str, Any]]]):
+        """Apply partial updates to several jobs in one transaction.
+
+        Each change is a job id with the columns to set. Jobs updating the same set
+        of columns are sent together as one batch of statements.
+        """
+        return await asyncio.to_thread(self._run, self._update_processing_riot_events_jobs, changes)
+
+    def _update_processing_riot_events_jobs(self, cursor, changes: List[Tuple[str, Dict[str, Any]]]):
+        batches: Dict[Tuple[str, ...], List[tuple]] = {}
+        for job_id, columns in changes:
+            names = tuple(sorted(columns))
+            batches.setdefault(names, []).append(tuple(columns[name] for name in names) + (job_id,))
+
+        for names, rows in batches.items():
+            # Column names come from the writer's fixed column list, never from input
+            assignments = ", ".join(f"{name} = %s" for name in names)
+            psycopg2.extras.execute_batch(
+                cursor,
+                f"UPDATE processing_riot_events_jobs SET {assignments} WHERE id = %s",
+                rows
+            )
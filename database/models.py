@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 import uuid
 from pydantic import BaseModel, Field
@@ -10,9 +10,35 @@ class ProcessingRiotEventStatus(Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+# What happens to a job still queued past its deadline
+EXPIRY_ACTIONS = ("drop", "downgrade")
+
+class AudioSegment(BaseModel):
+    index: int
+    text: str
+    audio_url: str
+    audio_duration: float
+    created_at: datetime = Field(default_factory=datetime.now)
+
+class StageMetrics(BaseModel):
+    queue_depth: int
+    wait_seconds: float
+    batch_size: int = 1
+    duration_seconds: Optional[float] = None
+
 class ProcessingRiotEventJob(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     riot_event_id: str
+    # Every riot event the job answers, several when a burst was coalesced into it
+    riot_event_ids: List[str] = Field(default_factory=list)
+    event_name: Optional[str] = None
+    # Registry names of the models requested for the job, the current ones when unset
+    llm_model: Optional[str] = None
+    tts_model: Optional[str] = None
+    # Scheduling of the job while queued, higher priorities go first
+    priority: int = 0
+    deadline_at: Optional[datetime] = None
+    on_expiry: str = "drop"
     status: ProcessingRiotEventStatus
     input_text: str
     llm_started_at: Optional[datetime] = None
@@ -25,6 +51,8 @@ class ProcessingRiotEventJob(BaseModel):
     tts_model_name: Optional[str] = None
     audio_url: Optional[str] = None
     audio_duration: Optional[float] = None
+    audio_segments: List[AudioSegment] = Field(default_factory=list)
+    stages: Dict[str, StageMetrics] = Field(default_factory=dict)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: Optional[datetime] = None
     
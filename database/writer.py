@@ -0,0 +1,173 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from database.database import Database, array_literal
+from database.models import ProcessingRiotEventJob, ProcessingRiotEventStatus
+
+# Columns of processing_riot_events_jobs owned by the pipeline
+JOB_COLUMNS = (
+    "riot_event_id", "riot_event_ids", "status", "input_text", "llm_started_at", "llm_completed_at",
+    "llm_model_name", "llm_text", "error_message", "tts_started_at", "tts_completed_at",
+    "tts_model_name", "audio_url", "audio_duration",
+)
+
+FINAL_STATUSES = (ProcessingRiotEventStatus.COMPLETED, ProcessingRiotEventStatus.FAILED)
+
+# Longest wait between flushes while the database keeps failing
+MAX_BACKOFF = 30.0
+
+
+def _columns(job: ProcessingRiotEventJob) -> Dict[str, Any]:
+    values = {column: getattr(job, column) for column in JOB_COLUMNS}
+    values["status"] = job.status.value
+    # Every event the job answers, so events coalesced into it can be found after a restart
+    values["riot_event_ids"] = array_literal(job.riot_event_ids or [job.riot_event_id])
+    return values
+
+
+class JobWriter:
+    """Write-behind buffer for job status updates.
+
+    Updates of the same job are merged until the next flush, which writes only the
+    columns that changed since the last write, for every buffered job in one
+    transaction. A flush happens every `flush_interval` seconds or as soon as
+    `max_pending` jobs are buffered.
+
+    Failed flushes keep their jobs buffered and the next ones back off, up to
+    `MAX_BACKOFF` seconds. Past `max_backlog` buffered jobs the oldest updates are
+    dropped, so while the database is down memory stays bounded but updates are
+    lost, as is everything still buffered on a crash.
+    """
+
+    def __init__(self, database: Database, flush_interval: float = 1.0, max_pending: int = 100, max_backlog: int = 1000):
+        self._database = database
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_backlog = max_backlog
+
+        self._pending: Dict[str, ProcessingRiotEventJob] = {}
+        # Last values written for each job still in progress
+        self._written: Dict[str, Dict[str, Any]] = {}
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.flushes = 0
+        self.rows_written = 0
+        self.updates_merged = 0
+        self.updates_dropped = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def track(self, jobs: Iterable[ProcessingRiotEventJob]) -> None:
+        """Remember the state of freshly inserted jobs so later writes only send changes"""
+        for job in jobs:
+            self._written[job.id] = _columns(job)
+
+    def update(self, job: ProcessingRiotEventJob) -> None:
+        """Buffer the current state of a job for the next flush"""
+        if job.id in self._pending:
+            self.updates_merged += 1
+
+        self._pending[job.id] = job
+        if len(self._pending) >= self.max_pending:
+            self._wake.set()
+
+    def start(self) -> asyncio.Task:
+        """Start the periodic flush task"""
+        self._task = asyncio.create_task(self._run(), name="job-writer")
+        return self._task
+
+    async def _run(self):
+        failures = 0
+        while True:
+            if failures:
+                # A full buffer does not force a flush while the database keeps failing
+                await asyncio.sleep(min(self.flush_interval * 2 ** failures, MAX_BACKOFF))
+            else:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            self._wake.clear()
+            try:
+                await self.flush()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                print(f"❌ Job writer flush failed {failures} time(s) in a row, backing off: {e}")
+
+    async def flush(self) -> None:
+        """Write every buffered job, keeping them buffered if the write fails"""
+        async with self._lock:
+            if not self._pending:
+                return
+
+            jobs, self._pending = self._pending, {}
+
+            values = {job_id: _columns(job) for job_id, job in jobs.items()}
+
+            changes = []
+            for job_id, job in jobs.items():
+                written = self._written.get(job_id, {})
+                changed = {
+                    column: value for column, value in values[job_id].items()
+                    if column not in written or written[column] != value
+                }
+                if changed:
+                    job.updated_at = datetime.now()
+                    changed["updated_at"] = job.updated_at
+                    changes.append((job_id, changed))
+
+            written = False
+            try:
+                if changes:
+                    await self._database.update_processing_riot_events_jobs(changes)
+                written = True
+            finally:
+                # Failed or cancelled, the jobs stay buffered, newer updates buffered meanwhile win
+                if not written:
+                    self._pending = {**jobs, **self._pending}
+                    self._trim()
+
+            self.flushes += 1
+            self.rows_written += len(changes)
+
+            for job_id, job in jobs.items():
+                if job.status in FINAL_STATUSES:
+                    self._written.pop(job_id, None)
+                else:
+                    self._written[job_id] = values[job_id]
+
+    def _trim(self) -> None:
+        """Drop the oldest buffered updates past `max_backlog`"""
+        excess = len(self._pending) - self.max_backlog
+        if excess <= 0:
+            return
+
+        dropped = list(self._pending)[:excess]
+        for job_id in dropped:
+            job = self._pending.pop(job_id)
+            if job.status in FINAL_STATUSES:
+                self._written.pop(job_id, None)
+
+        self.updates_dropped += excess
+        print(f"⚠️  Job writer backlog over {self.max_backlog} jobs, dropped the updates of {excess}: {', '.join(dropped)}")
+
+    async def close(self) -> None:
+        """Stop the periodic task and write everything still buffered.
+
+        Stop whatever calls `update` first, later updates are not written.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            # A flush cancelled midway puts its jobs back before the task ends
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        await self.flush()
+        print("🐟 Job writer flushed")
@@ -1,22 +1,71 @@
-from asyncio.queues import Queue
 from pathlib import Path, PurePath
 from typing import Optional
-from database.models import ProcessingRiotEventJob
 from ai.models.registry import ModelRegistry
+from ai.models.llm.cache import ResponseCache
+from ai.models.tts.cache import AudioCache
 from ai.prompts.manager import PromptManager
 from externals.objectStorage import ObjectStorage
+from externals.uploader import AsyncUploader
 from database.database import Database
+from database.writer import JobWriter
+from server.broadcaster import StatusBroadcaster
+from server.coalescer import EventCoalescer
+from server.scheduler import EventScheduler
+from server.settings import Settings
+from server.timeline import timeline
 
 class AppState:
     """Application-wide state container"""
     
     def __init__(self, path: str):
-        self.model_registry = ModelRegistry()
-        self.events_queue = Queue[ProcessingRiotEventJob]()
-        self.events_status = Queue[ProcessingRiotEventJob]()
+        self.settings = Settings.from_yaml(path)
+        self.model_registry = ModelRegistry(
+            memory_budget_mb=self.settings.models.memory_budget_mb,
+            catalog=self.settings.models.catalog
+        )
+        self.events_queue = EventScheduler(wait_samples=self.settings.scheduler.wait_samples)
+        self.event_coalescer = EventCoalescer(
+            window=self.settings.coalescing.window,
+            max_events=self.settings.coalescing.max_events
+        )
+        self.events_status = StatusBroadcaster(
+            buffer_size=self.settings.sse.buffer_size,
+            retention=self.settings.sse.retention
+        )
         self.prompt_manager = PromptManager(path)
-        self.database = Database() 
-        self.object_storage = ObjectStorage()
+        self.llm_cache = ResponseCache(
+            max_entries=self.settings.llm_cache.max_entries,
+            ttl_seconds=self.settings.llm_cache.ttl_seconds,
+            path=self.settings.llm_cache.path
+        )
+        self.audio_cache = AudioCache(
+            path=self.settings.tts_cache.path,
+            max_entries=self.settings.tts_cache.max_entries
+        )
+        with timeline.phase("database connect"):
+            self.database = Database(
+                min_connections=self.settings.database.min_connections,
+                max_connections=self.settings.database.max_connections
+            )
+        with timeline.phase("object storage init"):
+            self.object_storage = ObjectStorage(
+                max_pool_connections=self.settings.upload.workers,
+                multipart_threshold_mb=self.settings.upload.multipart_threshold_mb,
+                # The uploader retries, retries of the client would multiply its attempts
+                max_attempts=1
+            )
+        self.uploader = AsyncUploader(
+            self.object_storage,
+            workers=self.settings.upload.workers,
+            max_attempts=self.settings.upload.max_attempts,
+            backoff=self.settings.upload.backoff
+        )
+        self.job_writer = JobWriter(
+            self.database,
+            flush_interval=self.settings.write_behind.flush_interval,
+            max_pending=self.settings.write_behind.max_pending,
+            max_backlog=self.settings.write_behind.max_backlog
+        )
 
 def initialize_app_state(config_path: str) -> None:
     """Initialize app state with config path."""
@@ -43,22 +92,43 @@ def get_app_state() -> AppState:
 def get_database() -> Database:
     return get_app_state().database
 
+def get_job_writer() -> JobWriter:
+    return get_app_state().job_writer
+
 def get_object_storage() -> ObjectStorage:
     return get_app_state().object_storage
 
+def get_uploader() -> AsyncUploader:
+    return get_app_state().uploader
+
 def get_model_registry() -> ModelRegistry:
     """Dependency for model registry"""
     return get_app_state().model_registry
 
-def get_events_queue() -> Queue[ProcessingRiotEventJob]:
+def get_events_queue() -> EventScheduler:
     """Dependency for events queue"""
     return get_app_state().events_queue
 
+def get_event_coalescer() -> EventCoalescer:
+    """Dependency for the event deduplication and burst coalescing state"""
+    return get_app_state().event_coalescer
 
-def get_events_status() -> Queue[ProcessingRiotEventJob]:
-    """Dependency for events status queue"""
+def get_events_status() -> StatusBroadcaster:
+    """Dependency for events status broadcaster"""
     return get_app_state().events_status
 
+def get_llm_cache() -> ResponseCache:
+    """Dependency for the LLM response cache"""
+    return get_app_state().llm_cache
+
+def get_audio_cache() -> AudioCache:
+    """Dependency for the synthesized audio cache"""
+    return get_app_state().audio_cache
+
 def get_prompt_manager() -> PromptManager:
     """Dependency for events prompt manager"""
     return get_app_state().prompt_manager
+
+def get_settings() -> Settings:
+    """Dependency for runtime settings"""
+    return get_app_state().settings
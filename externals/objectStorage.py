@@ -1,20 +1,37 @@
 import boto3
+import io
 import os
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 
+MB = 1024 * 1024
+
 class ObjectStorage:
-    def __init__(self):
+    def __init__(self, max_pool_connections: int = 10, multipart_threshold_mb: int = 8, max_attempts: int = 3):
         print("🫎 Initializing ObjectStorage")
         self.session = boto3.session.Session()
         self.bucket, self.region, self.access_key, self.secret_key = self._load_env()
+        # Any S3-compatible endpoint (e.g. a local MinIO) can stand in for Spaces
+        self.endpoint_url = os.getenv("DIGITAL_OCEAN_SPACE_ENDPOINT")
         self.client = self.session.client(
             's3',
             region_name=self.region,
-            endpoint_url=f'https://{self.region}.digitaloceanspaces.com',
+            endpoint_url=self.endpoint_url or f'https://{self.region}.digitaloceanspaces.com',
             aws_access_key_id=self.access_key,
             aws_secret_access_key=self.secret_key,
-            config=Config(s3={'addressing_style': 'virtual'})
-
+            config=Config(
+                s3={'addressing_style': 'path' if self.endpoint_url else 'virtual'},
+                # One connection per upload worker so they never wait on the pool
+                max_pool_connections=max_pool_connections,
+                # 1 disables botocore retries, for callers retrying with their own backoff
+                retries={'max_attempts': max_attempts, 'mode': 'standard'},
+                tcp_keepalive=True
+            )
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold_mb * MB,
+            multipart_chunksize=multipart_threshold_mb * MB,
+            max_concurrency=4
         )
         print(f"🫎 ObjectStorage initialized with bucket: {self.bucket} and region: {self.region}")
 
@@ -38,9 +55,22 @@ class ObjectStorage:
 
         return bucket, region, access_key, secret_key
 
-    def upload(self, filename: str):
-        self.client.upload_file(filename, self.bucket, filename,            ExtraArgs={'ACL': 'public-read'})
-        file_url = f"https://{self.bucket}.{self.region}.digitaloceanspaces.com/{filename}"
-        return file_url
+    def url_for(self, key: str) -> str:
+        """Public URL of an object in the bucket"""
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket}/{key}"
+        return f"https://{self.bucket}.{self.region}.digitaloceanspaces.com/{key}"
 
+    def upload(self, data: bytes, key: str, content_type: str = "application/octet-stream"):
+        """Stream an in-memory object to the bucket and return its public URL.
 
+        Objects above the multipart threshold are sent as concurrent multipart parts.
+        """
+        self.client.upload_fileobj(
+            io.BytesIO(data),
+            self.bucket,
+            key,
+            ExtraArgs={'ACL': 'public-read', 'ContentType': content_type},
+            Config=self.transfer_config
+        )
+        return self.url_for(key)
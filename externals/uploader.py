@@ -0,0 +1,88 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Protocol, Set
+
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotoConnectionError
+
+
+class Storage(Protocol):
+    def url_for(self, key: str) -> str: ...
+
+    def upload(self, data: bytes, key: str, content_type: str = "application/octet-stream") -> str: ...
+
+
+class AsyncUploader:
+    """Uploads objects from a pool of worker threads so the event loop never blocks on storage.
+
+    Any object exposing `upload` and `url_for` can be used as storage, which lets the
+    uploader run against an in-process fake or a local S3-compatible server. Transient
+    failures are retried here, so the storage client should not retry on its own.
+    """
+
+    def __init__(self, storage: Storage, workers: int = 8, max_attempts: int = 4, backoff: float = 0.5):
+        print(f"🫎 Initializing AsyncUploader with {workers} workers")
+        self.storage = storage
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="uploader")
+        self._pending: Set[asyncio.Future] = set()
+
+    @property
+    def pending(self) -> int:
+        """Number of uploads submitted and not finished yet"""
+        return len(self._pending)
+
+    def url_for(self, key: str) -> str:
+        """URL the object will have once uploaded"""
+        return self.storage.url_for(key)
+
+    def submit(self, data: bytes, key: str, content_type: str = "application/octet-stream") -> asyncio.Future:
+        """Schedule an upload and return a future resolving to the object URL"""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._upload, data, key, content_type)
+
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+
+        return future
+
+    async def upload(self, data: bytes, key: str, content_type: str = "application/octet-stream") -> str:
+        """Upload an object without blocking the event loop"""
+        return await self.submit(data, key, content_type)
+
+    async def flush(self) -> None:
+        """Wait for every upload submitted so far"""
+        if self._pending:
+            print(f"🫎 Flushing {len(self._pending)} pending uploads")
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Flush pending uploads and stop the workers"""
+        await self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _upload(self, data: bytes, key: str, content_type: str) -> str:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return self.storage.upload(data, key, content_type)
+            except Exception as e:
+                if attempt == self.max_attempts or not self._is_retryable(e):
+                    raise
+
+                # Exponential backoff with jitter so retries of a burst do not line up
+                delay = self.backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                print(f"⚠️  Upload of {key} failed ({e}), retry {attempt}/{self.max_attempts - 1} in {delay:.2f}s")
+                time.sleep(delay)
+
+    def _is_retryable(self, error: Exception) -> bool:
+        """Throttling, server errors and dropped or timed out connections, never programming errors"""
+        if isinstance(error, ClientError):
+            status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+            code = error.response.get("Error", {}).get("Code", "")
+            return status >= 500 or status == 429 or code in ("SlowDown", "Throttling", "RequestTimeout")
+
+        # Endpoint unreachable, connect or read timeouts and connections closed midway
+        return isinstance(error, (BotoConnectionError, HTTPClientError, ConnectionError, TimeoutError))
@@ -1,12 +1,16 @@
+from server.timeline import timeline
+
 import argparse
 from pathlib import Path
-from dotenv import load_dotenv
-from server.server import Server
+
+with timeline.phase("import"):
+    from dotenv import load_dotenv
+    from server.server import Server
 
 load_dotenv()
 
-def get_config_path() -> str:
-    """Get config path from CLI args or use default."""
+def parse_args() -> argparse.Namespace:
+    """Get config path and startup options from CLI args."""
     parser = argparse.ArgumentParser(description="Inference API Server")
     parser.add_argument(
         "--config",
@@ -15,18 +19,24 @@ def get_config_path() -> str:
         default="server/config.yaml",
         help="Path to config.yaml file (default: server/config.yaml)"
     )
+    parser.add_argument(
+        "--startup-timeline",
+        action="store_true",
+        help="Print the startup timeline once the models are loaded and after the first request"
+    )
     
     args, _ = parser.parse_known_args()
-    return args.config
+    return args
 
 
-config_path = get_config_path()
+args = parse_args()
+config_path = args.config
 
 if not Path(config_path).exists():
     print(f"⚠️  Warning: Config file not found at {config_path}")
     print(f"   Using default: server/config.yaml")
     config_path = "server/config.yaml"
 
-server = Server(config_path=config_path)
+server = Server(config_path=config_path, print_timeline=args.startup_timeline)
 
-app = server.app
\ No newline at end of file
+app = server.app
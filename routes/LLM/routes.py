@@ -1,8 +1,9 @@
 from typing import Annotated
 from fastapi import APIRouter, HTTPException, Depends
+from ai.models.registry import ModelSwitch
 from middlewares.auth import verify_token_flexible
 from services.LLM.service import LLMService
-from schemas.models.schema import InfoResponse, CurrentResponse,SetPayload,SetResponse
+from schemas.models.schema import CacheResponse, InfoResponse, CurrentResponse, ModelSettings, ResidencyResponse, SetPayload, SwitchResponse
 
 Service = Annotated[LLMService, Depends()]
 
@@ -11,27 +12,63 @@ llm_router = APIRouter(prefix="/llm", tags=["llm"], dependencies=[Depends(verify
 @llm_router.get("/", response_model=CurrentResponse)
 async def get_current_model(service: Service):
     """Get current active LLM model"""
-    model = service.get_current_model()
-    return CurrentResponse(current_model=model.model_name)
+    return CurrentResponse(
+        current_model=service.get_current_model(),
+        ready=service.is_ready(),
+        settings=ModelSettings(**service.get_model_settings())
+    )
 
-@llm_router.put("/switch", response_model=SetResponse)
+def _switch_response(switch: ModelSwitch, service: Service) -> SwitchResponse:
+    return SwitchResponse(
+        current_model=service.get_current_model(),
+        model_name=switch.model_name,
+        previous_model=switch.previous_model,
+        state=switch.state.value,
+        started_at=switch.started_at,
+        finished_at=switch.finished_at,
+        elapsed_seconds=switch.elapsed_seconds,
+        error=switch.error,
+    )
+
+@llm_router.put("/switch", response_model=SwitchResponse, status_code=202)
 async def switch_llm_model(
     request: SetPayload,
     service: Service,
 ):
-    """Set current LLM model"""
+    """Start loading a LLM model in the background, the current one serves until it is ready"""
     try:
-        new_model = service.set_current_model(request.model_name)
-                
-        return SetResponse(
-            current_model=new_model.model_name,
-        )
+        switch = service.switch_model(request.model_name)
+        return _switch_response(switch, service)
     except RuntimeError as e:
-        return HTTPException(status_code=503, detail=str(e))
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@llm_router.get("/switch", response_model=SwitchResponse)
+async def get_switch(service: Service):
+    """Get the progress of the last LLM model switch"""
+    switch = service.get_switch()
+    if switch is None:
+        raise HTTPException(status_code=404, detail="No model switch started")
+    return _switch_response(switch, service)
+
 @llm_router.get("/list", response_model=InfoResponse)
 async def list_models(service: Service):
     """List all available LLM models"""
-    return InfoResponse(models=service.list_models())
\ No newline at end of file
+    return InfoResponse(models=service.list_models())
+
+@llm_router.get("/cache", response_model=CacheResponse)
+async def get_cache_stats(service: Service):
+    """Get response cache hits and misses"""
+    return CacheResponse(**service.get_cache_stats())
+
+@llm_router.delete("/cache", response_model=CacheResponse)
+async def clear_cache(service: Service):
+    """Drop every cached response"""
+    service.clear_cache()
+    return CacheResponse(**service.get_cache_stats())
+
+@llm_router.get("/resident", response_model=ResidencyResponse)
+async def get_residency(service: Service):
+    """Get the loaded LLM models and the memory they use"""
+    return ResidencyResponse(**service.get_residency())
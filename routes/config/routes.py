@@ -1,10 +1,29 @@
-from fastapi import APIRouter
+from typing import Annotated
+from fastapi import APIRouter, Depends
 
-from schemas.config.schema import HealthResponse
+from ai.models.registry import ModelRegistry
+from database.database import Database
+from dependencies.state import get_database, get_model_registry
+from schemas.config.schema import HealthResponse, StartupResponse
+from server.timeline import timeline
 
 config_router = APIRouter(prefix="/config", tags=["config"])
     
 @config_router.get("/health", response_model=HealthResponse)
-async def health():
-    return HealthResponse(status="success")
+async def health(
+    database: Annotated[Database, Depends(get_database)],
+    model_registry: Annotated[ModelRegistry, Depends(get_model_registry)]
+):
+    database_ok = await database.ping()
+    models_ok = model_registry.is_ready("llm") and model_registry.is_ready("tts")
+    return HealthResponse(status="success" if database_ok and models_ok else "degraded", database=database_ok, models=models_ok)
 
+@config_router.get("/startup", response_model=StartupResponse)
+async def startup(model_registry: Annotated[ModelRegistry, Depends(get_model_registry)]):
+    """Get the startup timeline: imports, connections, model loads, warmup baseline and first request"""
+    return StartupResponse(
+        llm_ready=model_registry.is_ready("llm"),
+        tts_ready=model_registry.is_ready("tts"),
+        warmup=model_registry.baseline,
+        **timeline.as_dict()
+    )
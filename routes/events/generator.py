@@ -1,4 +1,5 @@
 from asyncio import sleep
+from typing import Optional
 from fastapi import Request
 from uuid import uuid4
 from datetime import datetime, timedelta
@@ -7,20 +8,27 @@ from random import uniform
 from database.models import ProcessingRiotEventJob, ProcessingRiotEventStatus
 from services.events.service import EventService
 
-async def generator(request: Request, service: EventService):
-    while True:
-        if await request.is_disconnected():
-            break
+async def generator(request: Request, service: EventService, last_event_id: Optional[int] = None, keepalive: float = 15.0):
+    subscription = service.subscribe_events_status(last_event_id)
+    try:
+        while True:
+            if await request.is_disconnected():
+                break
 
-        last_event = await service.get_last_events_status()
-        yield ": keep-alive\n\n"
-        yield (
-            f"event: event_status\n"
-            f"id: {uuid4()}\n"
-            f"retry: 1000\n"
-            f"data: {last_event.model_dump_json()}\n\n"
-        )
-        await sleep(0.25)
+            events = await subscription.next(timeout=keepalive)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+
+            for event_id, data in events:
+                yield (
+                    f"event: event_status\n"
+                    f"id: {event_id}\n"
+                    f"retry: 1000\n"
+                    f"data: {data}\n\n"
+                )
+    finally:
+        subscription.close()
 
 async def generator_testing(request: Request, service: EventService):
 
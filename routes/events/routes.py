@@ -1,11 +1,13 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from fastapi.responses import StreamingResponse
 
 from middlewares.auth import verify_token_flexible
 from routes.events.generator import generator, generator_testing
-from schemas.events.schema import AddPayload, AddResponse, ClearResponse, InfoResponse
+from schemas.events.schema import AddPayload, AddResponse, ClearResponse, InfoResponse, SchedulerResponse
 from services.events.service import EventService
+from dependencies.state import get_settings
+from server.settings import Settings
 
 from database.models import ProcessingRiotEventJob, ProcessingRiotEventStatus
 from uuid import uuid4
@@ -17,7 +19,7 @@ events_router = APIRouter(prefix="/events", tags=["events"],dependencies=[Depend
 @events_router.post("/add", response_model=AddResponse)
 async def add_event(events: AddPayload, service: Service):
     try:
-        saved_ids = await service.add_events(events.events_ids)
+        saved_ids = await service.add_events(events.events_ids, events.llm_model, events.tts_model)
         return AddResponse(saved_ids=saved_ids)
     except ValueError as e:
         raise HTTPException(status_code=503, detail=str(e))
@@ -44,10 +46,28 @@ async def clear_events(service: Service):
     tracked, queue, status = await service.clear_events()
     return ClearResponse(tracked=tracked, queue=queue, status=status)
 
+@events_router.get("/scheduler", response_model=SchedulerResponse)
+async def get_scheduler_stats(service: Service):
+    """Get the queue wait percentiles and the expired jobs per event type"""
+    return SchedulerResponse(**service.get_scheduler_stats())
+
 @events_router.get("/sse")
-async def stream_events_status(request: Request, service: Service):
+async def stream_events_status(
+    request: Request,
+    service: Service,
+    settings: Annotated[Settings, Depends(get_settings)],
+    testing: bool = False,
+    last_event_id: Annotated[Optional[str], Header()] = None
+):
+    """Stream job status updates, resuming after the `Last-Event-ID` header when given"""
+    if testing:
+        stream = generator_testing(request, service)
+    else:
+        resume_from = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+        stream = generator(request, service, resume_from, settings.sse.keepalive)
+
     return StreamingResponse(
-        generator_testing(request, service),
+        stream,
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -10,7 +10,7 @@ from schemas.models.schema import (
     InfoResponse,
     CurrentResponse,
     SetPayload,
-    SetResponse,
+    SwitchResponse,
 )
 
 __all__ = [
@@ -22,5 +22,5 @@ __all__ = [
     "InfoResponse",
     "CurrentResponse",
     "SetPayload",
-    "SetResponse",
+    "SwitchResponse",
 ]
\ No newline at end of file
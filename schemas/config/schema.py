@@ -1,4 +1,33 @@
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 class HealthResponse(BaseModel):
-    status: str
\ No newline at end of file
+    status: str
+    database: bool
+    models: bool
+
+class StartupPhaseResponse(BaseModel):
+    name: str
+    started_at: float
+    duration: Optional[float] = None
+
+class WarmupLatency(BaseModel):
+    llm_seconds: float
+    tts_seconds: float
+    audio_seconds: float
+    first_llm_seconds: float
+    first_tts_seconds: float
+
+class WarmupResponse(BaseModel):
+    llm_model: str
+    tts_model: str
+    rounds: int
+    seconds: float
+    events: Dict[str, WarmupLatency]
+
+class StartupResponse(BaseModel):
+    uptime_seconds: float
+    llm_ready: bool
+    tts_ready: bool
+    phases: List[StartupPhaseResponse]
+    warmup: Optional[WarmupResponse] = None
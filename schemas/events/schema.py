@@ -1,12 +1,15 @@
-from typing import List
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 from database.models import ProcessingRiotEventJob
 
 class AddPayload(BaseModel):
     events_ids: List[str]
+    llm_model: Optional[str] = None
+    tts_model: Optional[str] = None
 
 class AddResponse(BaseModel):
+    # Job id per riot event, duplicated and coalesced events share the id of their job
     saved_ids: List[str]
 
 class InfoResponse(BaseModel):
@@ -15,4 +18,24 @@ class InfoResponse(BaseModel):
 class ClearResponse(BaseModel):
     tracked: int
     queue: int
-    status: int
\ No newline at end of file
+    status: int
+
+class ScheduledEventStats(BaseModel):
+    pending: int
+    dispatched: int
+    expired: int
+    downgraded: int
+    wait_p50: Optional[float] = None
+    wait_p95: Optional[float] = None
+    wait_max: Optional[float] = None
+
+class SchedulerResponse(BaseModel):
+    pending: int
+    dispatched: int
+    expired: int
+    downgraded: int
+    events: Dict[str, ScheduledEventStats]
+    # Ingestion: bursts still collecting events, events answered by an existing job
+    open_bursts: int = 0
+    duplicates: int = 0
+    coalesced: int = 0
@@ -1,14 +1,64 @@
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
 
 class InfoResponse(BaseModel):
     models: List[str]
 
+class ModelSettings(BaseModel):
+    backend: str
+    repo: str
+    file: Optional[str] = None
+    threads: int
+    context: Optional[int] = None
+    batch: Optional[int] = None
+    mlock: Optional[bool] = None
+    gpu_layers: Optional[int] = None
+    dtype: Optional[str] = None
+    quantize: Optional[bool] = None
+    compile: Optional[bool] = None
+    sampling: Dict[str, Any]
+
 class CurrentResponse(BaseModel):
     current_model: str
+    ready: bool
+    settings: ModelSettings
 
 class SetPayload(BaseModel):
     model_name: str
 
-class SetResponse(BaseModel):
-    current_model: str
\ No newline at end of file
+class SwitchResponse(BaseModel):
+    current_model: str
+    model_name: str
+    previous_model: str
+    state: str
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: float
+    error: Optional[str] = None
+
+class CacheResponse(BaseModel):
+    enabled: bool
+    entries: int
+    hits: int
+    disk_hits: int
+    misses: int
+    hit_rate: float
+
+class AudioCacheResponse(BaseModel):
+    enabled: bool
+    entries: int
+    hits: int
+    misses: int
+    hit_rate: float
+
+class ResidentModel(BaseModel):
+    model_name: str
+    footprint_mb: float
+    current: bool
+    in_use: bool
+
+class ResidencyResponse(BaseModel):
+    memory_budget_mb: float
+    resident_mb: float
+    models: List[ResidentModel]
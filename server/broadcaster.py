@@ -0,0 +1,100 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, List, Optional, Set, Tuple
+
+from database.models import ProcessingRiotEventJob
+
+# Event id and serialized job
+StatusEvent = Tuple[int, str]
+
+
+class Subscription:
+    """Bounded buffer of status events for one connected client.
+
+    When the client reads slower than events are published, the oldest buffered
+    events are dropped so a stalled client never holds memory or blocks publishers.
+    """
+
+    def __init__(self, broadcaster: 'StatusBroadcaster', buffer_size: int):
+        self._broadcaster = broadcaster
+        self._buffer: Deque[StatusEvent] = deque(maxlen=buffer_size)
+        self._ready = asyncio.Event()
+        self.dropped = 0
+
+    def push(self, event: StatusEvent) -> None:
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(event)
+        self._ready.set()
+
+    async def next(self, timeout: Optional[float] = None) -> List[StatusEvent]:
+        """Wait for events and return every buffered one, or an empty list on timeout"""
+        if not self._buffer:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return []
+
+        self._ready.clear()
+        events = list(self._buffer)
+        self._buffer.clear()
+        return events
+
+    def close(self) -> None:
+        self._broadcaster.unsubscribe(self)
+
+
+class StatusBroadcaster:
+    """Fans job status updates out to every subscriber.
+
+    Each update gets a monotonic id and is serialized once at publish time. The last
+    `retention` events are kept so a reconnecting client sending `Last-Event-ID`
+    gets what it missed replayed before live updates.
+    """
+
+    def __init__(self, buffer_size: int = 256, retention: int = 1024):
+        self.buffer_size = buffer_size
+        self._retained: Deque[StatusEvent] = deque(maxlen=retention)
+        self._subscribers: Set[Subscription] = set()
+        # Ids start from the clock so they keep increasing across restarts
+        self._last_id = time.time_ns() // 1_000_000
+
+        self.published = 0
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, job: ProcessingRiotEventJob) -> int:
+        """Send the current state of a job to every subscriber without waiting on them"""
+        self._last_id += 1
+        event = (self._last_id, job.model_dump_json())
+
+        self._retained.append(event)
+        for subscription in self._subscribers:
+            subscription.push(event)
+
+        self.published += 1
+        return self._last_id
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """Register a subscriber, replaying retained events newer than `last_event_id`"""
+        subscription = Subscription(self, self.buffer_size)
+
+        if last_event_id is not None:
+            for event in self._retained:
+                if event[0] > last_event_id:
+                    subscription.push(event)
+
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def clear(self) -> int:
+        """Forget the retained events, returning how many there were"""
+        size = len(self._retained)
+        self._retained.clear()
+        return size
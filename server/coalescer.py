@@ -0,0 +1,113 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
+
+from database.models import ProcessingRiotEventJob, RiotEvent
+
+
+class Burst:
+    """Events of one game session answered by a single job"""
+    session_id: str
+    job: ProcessingRiotEventJob
+    events: List[RiotEvent]
+
+    def __init__(self, session_id: str, job: ProcessingRiotEventJob, event: RiotEvent):
+        self.session_id = session_id
+        self.job = job
+        self.events = [event]
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._on_close: Optional[Callable[['Burst'], None]] = None
+
+    def accepts(self, llm_model: Optional[str], tts_model: Optional[str]) -> bool:
+        return (self.job.llm_model, self.job.tts_model) == (llm_model, tts_model)
+
+
+class EventCoalescer:
+    """Ingestion state shared by every request adding events.
+
+    Remembers the job of every riot event still pending or processing, so the same
+    event is never queued twice. With a `window`, the first event of a game session
+    opens a burst: events of that session added in the next `window` seconds join
+    its job instead of creating their own, up to `max_events`, and the job is only
+    queued once the burst closes.
+    """
+
+    def __init__(self, window: float = 0.0, max_events: int = 8):
+        self.window = window
+        self.max_events = max_events
+
+        self._jobs: Dict[str, ProcessingRiotEventJob] = {}
+        self._bursts: Dict[str, Burst] = {}
+
+        self.duplicates = 0
+        self.coalesced = 0
+
+    def duplicate_of(self, riot_event_id: str) -> Optional[ProcessingRiotEventJob]:
+        """Job already answering the riot event, None when it has none in progress"""
+        job = self._jobs.get(riot_event_id)
+        if job is not None:
+            self.duplicates += 1
+        return job
+
+    def track(self, riot_event_id: str, job: ProcessingRiotEventJob) -> None:
+        self._jobs[riot_event_id] = job
+
+    def release(self, job: ProcessingRiotEventJob) -> None:
+        """Forget the events of a finished job, adding them again creates a new job"""
+        for riot_event_id in job.riot_event_ids or [job.riot_event_id]:
+            if self._jobs.get(riot_event_id) is job:
+                del self._jobs[riot_event_id]
+
+    def burst_for(self, session_id: str, llm_model: Optional[str], tts_model: Optional[str]) -> Optional[Burst]:
+        """Open burst of the game session that an event for these models can join"""
+        burst = self._bursts.get(session_id)
+        if burst is None or not burst.accepts(llm_model, tts_model):
+            return None
+        return burst
+
+    def open(self, burst: Burst, on_close: Callable[[Burst], None]) -> None:
+        """Register a burst, `on_close` is called once it is full or its window is over"""
+        if self._bursts.get(burst.session_id) is not None:
+            # The older burst of the session stops accepting events, its timer still queues it
+            self._bursts.pop(burst.session_id)
+
+        self._bursts[burst.session_id] = burst
+        burst._on_close = on_close
+        if len(burst.events) >= self.max_events:
+            self.close(burst)
+        else:
+            burst._timer = asyncio.get_running_loop().call_later(self.window, self.close, burst)
+
+    def join(self, burst: Burst, event: RiotEvent) -> None:
+        """Add an event to an open burst, closing it when full"""
+        burst.events.append(event)
+        self.coalesced += 1
+        if len(burst.events) >= self.max_events:
+            self.close(burst)
+
+    def close(self, burst: Burst) -> None:
+        if self._bursts.get(burst.session_id) is burst:
+            del self._bursts[burst.session_id]
+        if burst._timer is not None:
+            burst._timer.cancel()
+            burst._timer = None
+
+        on_close, burst._on_close = burst._on_close, None
+        if on_close is not None:
+            on_close(burst)
+
+    def clear(self) -> int:
+        """Forget every event and drop the open bursts, returning how many were open"""
+        bursts = list(self._bursts.values())
+        for burst in bursts:
+            if burst._timer is not None:
+                burst._timer.cancel()
+        self._bursts.clear()
+        self._jobs.clear()
+        return len(bursts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open_bursts": len(self._bursts),
+            "duplicates": self.duplicates,
+            "coalesced": self.coalesced,
+        }
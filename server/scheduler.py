@@ -0,0 +1,150 @@
+import asyncio
+import heapq
+import itertools
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from database.models import ProcessingRiotEventJob
+
+# Tiers of the queue, downgraded jobs only run when no fresh job waits
+FRESH = 0
+DOWNGRADED = 1
+
+
+class EventScheduler:
+    """Queue of pending jobs, served by priority then by age, with deadlines.
+
+    A job still queued past its `deadline_at` is either handed out ahead of every
+    other so the caller fails it right away (drop), or moved behind every fresh
+    job (downgrade). Wait times are sampled per event type at dispatch, so
+    deadlines can be tuned against the real queueing delays.
+
+    Expiry is checked whenever a job is taken, there is a single consumer.
+    """
+
+    def __init__(self, wait_samples: int = 1024):
+        self.wait_samples = wait_samples
+
+        # Entries are [tier, -priority, sequence, job], ordered by the heap
+        self._heap: List[list] = []
+        # Pending entries by job id, an entry taken or replaced is no longer in it
+        self._entries: Dict[str, list] = {}
+        self._deadlines: List[tuple] = []
+        self._expired: Deque[ProcessingRiotEventJob] = deque()
+        self._sequence = itertools.count()
+        self._available = asyncio.Event()
+
+        self.dispatched: Counter = Counter()
+        self.expired: Counter = Counter()
+        self.downgraded: Counter = Counter()
+        self._waits: Dict[str, Deque[float]] = {}
+
+    def put(self, job: ProcessingRiotEventJob) -> None:
+        """Queue a job, its priority and deadline are read from the job"""
+        self._push(job, FRESH)
+        if job.deadline_at is not None:
+            heapq.heappush(self._deadlines, (job.deadline_at, next(self._sequence), job.id))
+        self._available.set()
+
+    def _push(self, job: ProcessingRiotEventJob, tier: int) -> None:
+        entry = [tier, -job.priority, next(self._sequence), job]
+        self._entries[job.id] = entry
+        heapq.heappush(self._heap, entry)
+
+    @staticmethod
+    def is_expired(job: ProcessingRiotEventJob, now: Optional[datetime] = None) -> bool:
+        return job.deadline_at is not None and (now or datetime.now()) > job.deadline_at
+
+    def expire(self, job: ProcessingRiotEventJob) -> None:
+        """Count a job dropped for its deadline, by the consumer failing it"""
+        self.expired[job.event_name] += 1
+
+    def _expire_due(self) -> None:
+        now = datetime.now()
+        while self._deadlines and self._deadlines[0][0] < now:
+            _, _, job_id = heapq.heappop(self._deadlines)
+            entry = self._entries.pop(job_id, None)
+            if entry is None:
+                continue
+
+            job = entry[-1]
+            # The stale entry stays in the heap and is skipped once popped
+            entry[-1] = None
+            if job.on_expiry == "downgrade":
+                self.downgraded[job.event_name] += 1
+                self._push(job, DOWNGRADED)
+            else:
+                self._expired.append(job)
+
+    async def get(self) -> ProcessingRiotEventJob:
+        """Next job to process: expired ones to drop first, then by tier, priority and age"""
+        while True:
+            self._expire_due()
+            if self._expired:
+                return self._expired.popleft()
+
+            while self._heap:
+                job = heapq.heappop(self._heap)[-1]
+                if job is None:
+                    continue
+
+                del self._entries[job.id]
+                self._record_wait(job)
+                return job
+
+            self._available.clear()
+            await self._available.wait()
+
+    def _record_wait(self, job: ProcessingRiotEventJob) -> None:
+        self.dispatched[job.event_name] += 1
+        waits = self._waits.setdefault(job.event_name, deque(maxlen=self.wait_samples))
+        waits.append((datetime.now() - job.created_at).total_seconds())
+
+    def qsize(self) -> int:
+        return len(self._entries) + len(self._expired)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def clear(self) -> int:
+        """Drop every pending job, returning how many there were"""
+        size = self.qsize()
+        self._heap.clear()
+        self._entries.clear()
+        self._deadlines.clear()
+        self._expired.clear()
+        return size
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and queue wait percentiles per event type, over the last sampled dispatches"""
+        pending = Counter(entry[-1].event_name for entry in self._entries.values())
+        event_names = set(self.dispatched) | set(self.expired) | set(self.downgraded) | set(pending)
+
+        events = {}
+        for event_name in sorted(event_names, key=str):
+            waits = sorted(self._waits.get(event_name, ()))
+            events[str(event_name)] = {
+                "pending": pending[event_name],
+                "dispatched": self.dispatched[event_name],
+                "expired": self.expired[event_name],
+                "downgraded": self.downgraded[event_name],
+                "wait_p50": _percentile(waits, 0.5),
+                "wait_p95": _percentile(waits, 0.95),
+                "wait_max": waits[-1] if waits else None,
+            }
+
+        return {
+            "pending": self.qsize(),
+            "dispatched": sum(self.dispatched.values()),
+            "expired": sum(self.expired.values()),
+            "downgraded": sum(self.downgraded.values()),
+            "events": events,
+        }
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(fraction * len(values)))]
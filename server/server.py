@@ -1,17 +1,24 @@
+import asyncio
 from asyncio import create_task
-from fastapi import FastAPI
+from typing import Optional
+from fastapi import FastAPI, Request
+from ai.models.models import Model
+from ai.models.warmup import Warmup
 from dependencies.state import get_app_state, initialize_app_state
 from routes import llm_router, tts_router, config_router, events_router
 from services.events.service import EventService
+from server.timeline import timeline
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 class Server:
 
-    def __init__(self, config_path: str = "server/config.yaml"):
+    def __init__(self, config_path: str = "server/config.yaml", print_timeline: bool = False):
         self.config_path = config_path
+        self.print_timeline = print_timeline
 
-        initialize_app_state(self.config_path)
+        with timeline.phase("app state"):
+            initialize_app_state(self.config_path)
 
         @asynccontextmanager
         async def lifespan(app: FastAPI):
@@ -20,6 +27,15 @@ class Server:
             yield
             # Shutdown
             print("🔄 Shutting down...")
+            # The pipeline stops first, nothing updates jobs once the writer is closed
+            self._processor.cancel()
+            await asyncio.gather(self._processor, return_exceptions=True)
+            await self._event_service.stop()
+            await get_app_state().uploader.close()
+            await get_app_state().job_writer.close()
+            get_app_state().database.close()
+            get_app_state().llm_cache.close()
+            get_app_state().audio_cache.close()
         
         self.app = FastAPI(
             lifespan=lifespan,
@@ -32,6 +48,14 @@ class Server:
         self._init_routes()
 
     def _init_middleware(self):
+        @self.app.middleware("http")
+        async def first_request(request: Request, call_next):
+            if not timeline.has("first request"):
+                timeline.mark("first request")
+                if self.print_timeline:
+                    print(timeline.report())
+            return await call_next(request)
+
         self.app.add_middleware(
             CORSMiddleware,
             allow_origins=["*"],
@@ -51,17 +75,98 @@ class Server:
         print("🚀 Server startup - initializing background tasks")
         
         app_state = get_app_state()
-        print(f"✅ AppState initialized with {len(app_state.model_registry.llm_models)} LLM models")
+        print(f"✅ AppState initialized with {len(app_state.model_registry.llm_models)} LLM models, loading them in the background")
         
         event_service = EventService(
             model_registry=app_state.model_registry,
             events_queue=app_state.events_queue,
+            event_coalescer=app_state.event_coalescer,
             events_status=app_state.events_status,
             prompt_manager=app_state.prompt_manager,
+            llm_cache=app_state.llm_cache,
+            audio_cache=app_state.audio_cache,
             database=app_state.database,
-            object_storage=app_state.object_storage
+            job_writer=app_state.job_writer,
+            uploader=app_state.uploader,
+            settings=app_state.settings
         )
         
-        create_task(event_service.events_processor())
+        app_state.job_writer.start()
+        # Live generations wait for the warmup, set before the processor can take a job
+        app_state.model_registry.warming_up = True
+        self._event_service = event_service
+        self._processor = create_task(event_service.events_processor())
         print("✅ Background event processor started")
 
+        create_task(self._load_models())
+
+        reload_interval = app_state.settings.prompts.reload_interval
+        if reload_interval:
+            create_task(app_state.prompt_manager.watch(reload_interval))
+            print(f"✅ Watching prompts for changes every {reload_interval}s")
+
+    async def _load_models(self):
+        """Load the current models concurrently once the API is up, then warm them up.
+
+        They report not ready, and the pipeline holds its generations, until the
+        warmup is done, so the first live event runs at steady-state latency.
+        """
+        app_state = get_app_state()
+        model_registry = app_state.model_registry
+
+        model_registry.warming_up = True
+        try:
+            llm, tts = await asyncio.gather(self._load_model("llm"), self._load_model("tts"))
+
+            warmup_settings = app_state.settings.warmup
+            if warmup_settings.enabled and llm is not None and tts is not None:
+                with timeline.phase("warmup"):
+                    await self._warmup(llm, tts)
+        finally:
+            model_registry.warming_up = False
+
+        timeline.mark("models ready")
+        print("✅ Models loaded")
+        if self.print_timeline:
+            print(timeline.report())
+
+    async def _load_model(self, kind: str) -> Optional[Model]:
+        model_registry = get_app_state().model_registry
+        name = model_registry.current_name(kind)
+        try:
+            with timeline.phase(f"import {kind} backend"):
+                model = await model_registry.instance(kind)
+            with timeline.phase(f"load {name}"):
+                return await model_registry.load(model)
+        except Exception as e:
+            print(f"❌ Failed to load {name}: {e}")
+            return None
+
+    async def _warmup(self, llm: Model, tts: Model):
+        """Run representative events through the models and keep their latency as the baseline"""
+        app_state = get_app_state()
+        prompt_manager = app_state.prompt_manager
+        settings = app_state.settings
+
+        prompts = prompt_manager.get_sample_prompts(settings.warmup.events)
+
+        warmup = Warmup(
+            llm,
+            tts,
+            prompt_manager.get_system_prompt(),
+            prompts,
+            rounds=settings.warmup.rounds,
+            streaming=settings.pipeline.streaming
+        )
+
+        print(f"🔥 Warming up with {len(prompts)} events, {settings.warmup.rounds} rounds")
+        try:
+            with app_state.model_registry.using(llm), app_state.model_registry.using(tts):
+                await asyncio.to_thread(warmup.run)
+        except Exception as e:
+            print(f"❌ Warmup failed: {e}")
+            return
+
+        app_state.model_registry.baseline = warmup.summary()
+        for event_name, latency in app_state.model_registry.baseline["events"].items():
+            print(f"🔥 {event_name}: llm {latency['llm_seconds']:.2f}s (first {latency['first_llm_seconds']:.2f}s), tts {latency['tts_seconds']:.2f}s (first {latency['first_tts_seconds']:.2f}s)")
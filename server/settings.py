@@ -0,0 +1,362 @@
+import os
+import yaml
+from typing import Any, Dict, Optional
+from ai.models.catalog import ModelCatalog
+from database.models import EXPIRY_ACTIONS
+
+class StageSettings:
+    concurrency: int
+    queue_size: int
+    batch_size: int
+    batch_window: float
+
+    def __init__(self, concurrency: int = 1, queue_size: int = 0, batch_size: int = 1, batch_window: float = 0.0):
+        if concurrency < 1:
+            raise ValueError(f"Stage concurrency must be at least 1, got {concurrency}")
+        if queue_size < 0:
+            raise ValueError(f"Stage queue_size must be positive, got {queue_size}")
+        if batch_size < 1:
+            raise ValueError(f"Stage batch_size must be at least 1, got {batch_size}")
+        if batch_window < 0:
+            raise ValueError(f"Stage batch_window must be positive, got {batch_window}")
+
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+
+class PipelineSettings:
+    streaming: bool
+    stages: Dict[str, StageSettings]
+
+    # Only one generation runs at a time on the shared weights, uploads are I/O bound
+    DEFAULT_STAGES = {
+        "llm": {"concurrency": 1, "queue_size": 4, "batch_size": 4},
+        "tts": {"concurrency": 1, "queue_size": 8, "batch_size": 8, "batch_window": 0.05},
+        "upload": {"concurrency": 4, "queue_size": 16},
+        "persistence": {"concurrency": 1, "queue_size": 64},
+    }
+
+    def __init__(self, streaming: bool = False, stages: Optional[Dict[str, StageSettings]] = None):
+        self.streaming = streaming
+        self.stages = stages or {
+            name: StageSettings(**values) for name, values in self.DEFAULT_STAGES.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'PipelineSettings':
+        data = data or {}
+        configured = data.get("stages") or {}
+
+        unknown = set(configured) - set(cls.DEFAULT_STAGES)
+        if unknown:
+            raise ValueError(f"Unknown pipeline stages: {', '.join(sorted(unknown))}")
+
+        stages = {}
+        for name, defaults in cls.DEFAULT_STAGES.items():
+            stages[name] = StageSettings(**{**defaults, **(configured.get(name) or {})})
+
+        return PipelineSettings(
+            streaming=bool(data.get("streaming", False)),
+            stages=stages
+        )
+
+class AudioSettings:
+    local_copy_dir: Optional[str]
+
+    def __init__(self, local_copy_dir: Optional[str] = None):
+        self.local_copy_dir = local_copy_dir
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'AudioSettings':
+        data = data or {}
+        local_copy_dir = data.get("local_copy_dir")
+
+        if local_copy_dir and not os.path.isdir(local_copy_dir):
+            raise ValueError(f"audio.local_copy_dir {local_copy_dir} is not a directory")
+
+        return AudioSettings(local_copy_dir=local_copy_dir)
+
+class UploadSettings:
+    workers: int
+    max_attempts: int
+    backoff: float
+    multipart_threshold_mb: int
+
+    def __init__(self, workers: int = 8, max_attempts: int = 4, backoff: float = 0.5, multipart_threshold_mb: int = 8):
+        if workers < 1:
+            raise ValueError(f"upload.workers must be at least 1, got {workers}")
+        if max_attempts < 1:
+            raise ValueError(f"upload.max_attempts must be at least 1, got {max_attempts}")
+        if multipart_threshold_mb < 5:
+            # S3 rejects multipart parts smaller than 5MB
+            raise ValueError(f"upload.multipart_threshold_mb must be at least 5, got {multipart_threshold_mb}")
+
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.multipart_threshold_mb = multipart_threshold_mb
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'UploadSettings':
+        return UploadSettings(**(data or {}))
+
+class DatabaseSettings:
+    min_connections: int
+    max_connections: int
+
+    def __init__(self, min_connections: int = 1, max_connections: int = 10):
+        if min_connections < 0 or max_connections < max(1, min_connections):
+            raise ValueError(f"Invalid database pool size {min_connections}-{max_connections}")
+
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'DatabaseSettings':
+        return DatabaseSettings(**(data or {}))
+
+class WriteBehindSettings:
+    flush_interval: float
+    max_pending: int
+    max_backlog: int
+
+    def __init__(self, flush_interval: float = 1.0, max_pending: int = 100, max_backlog: int = 1000):
+        if flush_interval <= 0:
+            raise ValueError(f"write_behind.flush_interval must be positive, got {flush_interval}")
+        if max_pending < 1:
+            raise ValueError(f"write_behind.max_pending must be at least 1, got {max_pending}")
+        if max_backlog < max_pending:
+            raise ValueError(f"write_behind.max_backlog must be at least max_pending ({max_pending}), got {max_backlog}")
+
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_backlog = max_backlog
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'WriteBehindSettings':
+        return WriteBehindSettings(**(data or {}))
+
+class SSESettings:
+    buffer_size: int
+    retention: int
+    keepalive: float
+
+    def __init__(self, buffer_size: int = 256, retention: int = 1024, keepalive: float = 15.0):
+        if buffer_size < 1:
+            raise ValueError(f"sse.buffer_size must be at least 1, got {buffer_size}")
+        if retention < 0:
+            raise ValueError(f"sse.retention must be positive, got {retention}")
+        if keepalive <= 0:
+            raise ValueError(f"sse.keepalive must be positive, got {keepalive}")
+
+        self.buffer_size = buffer_size
+        self.retention = retention
+        self.keepalive = keepalive
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'SSESettings':
+        return SSESettings(**(data or {}))
+
+class LLMCacheSettings:
+    enabled: bool
+    max_entries: int
+    ttl_seconds: float
+    path: Optional[str]
+
+    def __init__(self, enabled: bool = True, max_entries: int = 1024, ttl_seconds: float = 3600, path: Optional[str] = None):
+        if max_entries < 1:
+            raise ValueError(f"llm_cache.max_entries must be at least 1, got {max_entries}")
+        if ttl_seconds <= 0:
+            raise ValueError(f"llm_cache.ttl_seconds must be positive, got {ttl_seconds}")
+        if path and not os.path.isdir(os.path.dirname(os.path.abspath(path))):
+            raise ValueError(f"llm_cache.path {path} is not in an existing directory")
+
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'LLMCacheSettings':
+        return LLMCacheSettings(**(data or {}))
+
+class TTSCacheSettings:
+    enabled: bool
+    path: Optional[str]
+    max_entries: int
+
+    def __init__(self, enabled: bool = True, path: Optional[str] = None, max_entries: int = 10000):
+        if max_entries < 1:
+            raise ValueError(f"tts_cache.max_entries must be at least 1, got {max_entries}")
+        if path and not os.path.isdir(os.path.dirname(os.path.abspath(path))):
+            raise ValueError(f"tts_cache.path {path} is not in an existing directory")
+
+        self.enabled = enabled
+        self.path = path
+        self.max_entries = max_entries
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'TTSCacheSettings':
+        return TTSCacheSettings(**(data or {}))
+
+class PromptsSettings:
+    reload_interval: float
+
+    def __init__(self, reload_interval: float = 2.0):
+        if reload_interval < 0:
+            raise ValueError(f"prompts.reload_interval must be positive, got {reload_interval}")
+
+        self.reload_interval = reload_interval
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'PromptsSettings':
+        return PromptsSettings(**(data or {}))
+
+class ModelsSettings:
+    memory_budget_mb: float
+    catalog: ModelCatalog
+
+    def __init__(self, memory_budget_mb: float = 0, catalog: Optional[ModelCatalog] = None):
+        if memory_budget_mb < 0:
+            raise ValueError(f"models.memory_budget_mb must be positive, got {memory_budget_mb}")
+
+        self.memory_budget_mb = memory_budget_mb
+        self.catalog = catalog or ModelCatalog.from_dict(None)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'ModelsSettings':
+        data = data or {}
+        unknown = set(data) - {"memory_budget_mb", "current", "llm", "tts"}
+        if unknown:
+            raise ValueError(f"Unknown models settings: {', '.join(sorted(unknown))}")
+
+        return ModelsSettings(
+            memory_budget_mb=data.get("memory_budget_mb", 0),
+            catalog=ModelCatalog.from_dict(data)
+        )
+
+class SchedulerSettings:
+    default_priority: int
+    default_deadline: float
+    on_expiry: str
+    wait_samples: int
+
+    def __init__(self, default_priority: int = 0, default_deadline: float = 0, on_expiry: str = "drop", wait_samples: int = 1024):
+        if default_deadline < 0:
+            raise ValueError(f"scheduler.default_deadline must be positive, got {default_deadline}")
+        if on_expiry not in EXPIRY_ACTIONS:
+            raise ValueError(f"scheduler.on_expiry must be one of {', '.join(EXPIRY_ACTIONS)}, got {on_expiry}")
+        if wait_samples < 1:
+            raise ValueError(f"scheduler.wait_samples must be at least 1, got {wait_samples}")
+
+        self.default_priority = default_priority
+        self.default_deadline = default_deadline
+        self.on_expiry = on_expiry
+        self.wait_samples = wait_samples
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'SchedulerSettings':
+        return SchedulerSettings(**(data or {}))
+
+class CoalescingSettings:
+    window: float
+    max_events: int
+
+    def __init__(self, window: float = 0.0, max_events: int = 8):
+        if window < 0:
+            raise ValueError(f"coalescing.window must be positive, got {window}")
+        if max_events < 1:
+            raise ValueError(f"coalescing.max_events must be at least 1, got {max_events}")
+
+        self.window = window
+        self.max_events = max_events
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'CoalescingSettings':
+        return CoalescingSettings(**(data or {}))
+
+class WarmupSettings:
+    enabled: bool
+    rounds: int
+    events: Dict[str, Dict[str, Any]]
+
+    def __init__(self, enabled: bool = True, rounds: int = 2, events: Optional[Dict[str, Dict[str, Any]]] = None):
+        if rounds < 1:
+            raise ValueError(f"warmup.rounds must be at least 1, got {rounds}")
+
+        self.enabled = enabled
+        self.rounds = rounds
+        self.events = events or {}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'WarmupSettings':
+        return WarmupSettings(**(data or {}))
+
+class Settings:
+    """Runtime settings read from the optional sections of config.yaml"""
+    pipeline: PipelineSettings
+    audio: AudioSettings
+    upload: UploadSettings
+    database: DatabaseSettings
+    write_behind: WriteBehindSettings
+    sse: SSESettings
+    llm_cache: LLMCacheSettings
+    tts_cache: TTSCacheSettings
+    prompts: PromptsSettings
+    models: ModelsSettings
+    warmup: WarmupSettings
+    scheduler: SchedulerSettings
+    coalescing: CoalescingSettings
+
+    def __init__(
+        self,
+        pipeline: Optional[PipelineSettings] = None,
+        audio: Optional[AudioSettings] = None,
+        upload: Optional[UploadSettings] = None,
+        database: Optional[DatabaseSettings] = None,
+        write_behind: Optional[WriteBehindSettings] = None,
+        sse: Optional[SSESettings] = None,
+        llm_cache: Optional[LLMCacheSettings] = None,
+        tts_cache: Optional[TTSCacheSettings] = None,
+        prompts: Optional[PromptsSettings] = None,
+        models: Optional[ModelsSettings] = None,
+        warmup: Optional[WarmupSettings] = None,
+        scheduler: Optional[SchedulerSettings] = None,
+        coalescing: Optional[CoalescingSettings] = None
+    ):
+        self.pipeline = pipeline or PipelineSettings()
+        self.audio = audio or AudioSettings()
+        self.upload = upload or UploadSettings()
+        self.database = database or DatabaseSettings()
+        self.write_behind = write_behind or WriteBehindSettings()
+        self.sse = sse or SSESettings()
+        self.llm_cache = llm_cache or LLMCacheSettings()
+        self.tts_cache = tts_cache or TTSCacheSettings()
+        self.prompts = prompts or PromptsSettings()
+        self.models = models or ModelsSettings()
+        self.warmup = warmup or WarmupSettings()
+        self.scheduler = scheduler or SchedulerSettings()
+        self.coalescing = coalescing or CoalescingSettings()
+
+    @classmethod
+    def from_yaml(cls, yaml_path: str) -> 'Settings':
+        """Load settings from YAML config file, missing sections use defaults"""
+        with open(yaml_path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f) or {}
+
+            return Settings(
+                pipeline=PipelineSettings.from_dict(data.get("pipeline")),
+                audio=AudioSettings.from_dict(data.get("audio")),
+                upload=UploadSettings.from_dict(data.get("upload")),
+                database=DatabaseSettings.from_dict(data.get("database")),
+                write_behind=WriteBehindSettings.from_dict(data.get("write_behind")),
+                sse=SSESettings.from_dict(data.get("sse")),
+                llm_cache=LLMCacheSettings.from_dict(data.get("llm_cache")),
+                tts_cache=TTSCacheSettings.from_dict(data.get("tts_cache")),
+                prompts=PromptsSettings.from_dict(data.get("prompts")),
+                models=ModelsSettings.from_dict(data.get("models")),
+                warmup=WarmupSettings.from_dict(data.get("warmup")),
+                scheduler=SchedulerSettings.from_dict(data.get("scheduler")),
+                coalescing=CoalescingSettings.from_dict(data.get("coalescing"))
+            )
@@ -0,0 +1,67 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class StartupPhase:
+    """Step of the server startup, in seconds since the process started importing"""
+    name: str
+    started_at: float
+    duration: Optional[float]
+
+    def __init__(self, name: str, started_at: float, duration: Optional[float] = None):
+        self.name = name
+        self.started_at = started_at
+        self.duration = duration
+
+
+class StartupTimeline:
+    """Timeline of the server startup: imports, connections, model loads and first request.
+
+    Phases have a duration, marks are instants. Offsets are measured from the
+    creation of the timeline, at the very start of main.py.
+    """
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self.phases: List[StartupPhase] = []
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._origin
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[StartupPhase]:
+        phase = StartupPhase(name, self._now())
+        self.phases.append(phase)
+        try:
+            yield phase
+        finally:
+            phase.duration = self._now() - phase.started_at
+
+    def mark(self, name: str) -> None:
+        """Record an instant, only its first occurrence is kept"""
+        if not self.has(name):
+            self.phases.append(StartupPhase(name, self._now()))
+
+    def has(self, name: str) -> bool:
+        return any(phase.name == name for phase in self.phases)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "uptime_seconds": self._now(),
+            "phases": [
+                {"name": phase.name, "started_at": phase.started_at, "duration": phase.duration}
+                for phase in sorted(self.phases, key=lambda phase: phase.started_at)
+            ],
+        }
+
+    def report(self) -> str:
+        lines = ["⏱️  Startup timeline"]
+        for phase in sorted(self.phases, key=lambda phase: phase.started_at):
+            duration = f"{phase.duration:8.3f}s" if phase.duration is not None else " " * 9
+            lines.append(f"   {phase.started_at:8.3f}s {duration}  {phase.name}")
+        return "\n".join(lines)
+
+
+# Created when first imported, main.py imports it before anything else
+timeline = StartupTimeline()
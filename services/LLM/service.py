@@ -1,11 +1,11 @@
-from asyncio.queues import Queue
-from typing import Annotated, List, Dict
+from typing import Annotated, Any, List, Dict, Optional
 
 from fastapi import Depends
-from dependencies.state import get_events_queue, get_model_registry
-from ai.models.registry import ModelRegistry
-from ai.models.models import Model
-from database.models import ProcessingRiotEventJob
+from dependencies.state import get_events_queue, get_llm_cache, get_model_registry, get_settings
+from ai.models.llm.cache import ResponseCache
+from ai.models.registry import MB, ModelRegistry, ModelSwitch
+from server.scheduler import EventScheduler
+from server.settings import Settings
 
 class LLMService:
     """Service for managing LLM models"""
@@ -13,36 +13,55 @@ class LLMService:
     def __init__(
         self, 
         model_registry: Annotated[ModelRegistry, Depends(get_model_registry)],
-        events_queue: Annotated[Queue[ProcessingRiotEventJob], Depends(get_events_queue)]
+        events_queue: Annotated[EventScheduler, Depends(get_events_queue)],
+        llm_cache: Annotated[ResponseCache, Depends(get_llm_cache)],
+        settings: Annotated[Settings, Depends(get_settings)]
     ):
         self._model_registry = model_registry
         self._events_queue = events_queue
+        self._llm_cache = llm_cache
+        self._settings = settings
     
     def list_models(self) -> List[str]:
         """Get list of available models"""
         return list(self._model_registry.llm_models.keys())
     
-    def get_current_model(self) -> Model:
-        """Get currently active model"""
-        return self._model_registry.current_llm
+    def get_current_model(self) -> str:
+        """Get the name of the currently active model"""
+        return self._model_registry.current_name("llm")
+
+    def get_model_settings(self) -> Dict[str, Any]:
+        """Get the runtime settings of the current model from the catalog"""
+        return self._model_registry.settings_of("llm")
+
+    def is_ready(self) -> bool:
+        """Check if the current model is loaded"""
+        return self._model_registry.is_ready("llm")
     
-    def set_current_model(self, model_name: str) -> Model:
-        """Switch to a different model"""
-        if model_name not in self._model_registry.llm_models:
-            raise ValueError(f"Model {model_name} not found")
-        
-        if not self._events_queue.empty():
-            raise RuntimeError("Cannot switch models while queue is not empty")
-        
-        self._model_registry.current_llm.unload()
-        
-        new_model = self._model_registry.llm_models[model_name]
-        new_model.load()
-        
-        self._model_registry.current_llm = new_model
-        
-        return new_model
+    def switch_model(self, model_name: str) -> ModelSwitch:
+        """Start switching to a different model, the current one keeps serving until it is loaded"""
+        return self._model_registry.start_switch("llm", model_name)
+
+    def get_switch(self) -> Optional[ModelSwitch]:
+        """Get the progress of the last model switch"""
+        return self._model_registry.switches.get("llm")
     
     def is_queue_empty(self) -> bool:
         """Check if processing queue is empty"""
-        return self._events_queue.empty()
\ No newline at end of file
+        return self._events_queue.empty()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get response cache counters"""
+        return {"enabled": self._settings.llm_cache.enabled, **self._llm_cache.stats()}
+
+    def clear_cache(self) -> None:
+        """Drop every cached response, in memory and on disk"""
+        self._llm_cache.clear()
+
+    def get_residency(self) -> Dict[str, Any]:
+        """Get the loaded models with their measured footprint"""
+        return {
+            "memory_budget_mb": self._model_registry.memory_budget_bytes / MB,
+            "resident_mb": self._model_registry.resident_bytes / MB,
+            "models": self._model_registry.residency("llm"),
+        }
@@ -0,0 +1,129 @@
+import asyncio
+from asyncio.queues import Queue
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ai.models.tts.audio import AudioClip
+from database.models import ProcessingRiotEventJob, StageMetrics
+
+
+class StageTask:
+    """Unit of work flowing between pipeline stages"""
+    job: ProcessingRiotEventJob
+    text: Optional[str]
+    segment: Optional[int]
+    audio: Optional[AudioClip]
+    audio_key: Optional[str]
+    enqueued_at: datetime
+
+    def __init__(self, job: ProcessingRiotEventJob, text: Optional[str] = None, segment: Optional[int] = None):
+        self.job = job
+        self.text = text
+        self.segment = segment
+        self.audio = None
+        self.audio_key = None
+        self.enqueued_at = datetime.now()
+
+
+class JobProgress:
+    """Counts the audio segments of a job that went through the whole pipeline"""
+    expected: Optional[int]
+    done: int
+    # Synthesized clip of each streamed segment, joined into the job audio once complete
+    clips: Dict[int, AudioClip]
+
+    def __init__(self):
+        self.expected = None
+        self.done = 0
+        self.clips = {}
+
+    @property
+    def complete(self) -> bool:
+        return self.expected is not None and self.done >= self.expected
+
+
+class Stage:
+    """Bounded queue drained by a pool of workers running the same handler.
+
+    A batched stage hands its handler a list of tasks: every task already waiting,
+    plus those arriving within `batch_window` seconds, up to `batch_size`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[None]],
+        on_error: Optional[Callable[[StageTask, Exception], Awaitable[None]]] = None,
+        concurrency: int = 1,
+        queue_size: int = 0,
+        batched: bool = False,
+        batch_size: int = 1,
+        batch_window: float = 0.0
+    ):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue = Queue[StageTask](maxsize=queue_size)
+        self.batched = batched
+        self.batch_size = max(1, batch_size)
+        self.batch_window = max(0.0, batch_window)
+        self._handler = handler
+        self._on_error = on_error
+
+    async def put(self, task: StageTask, enqueued_at: Optional[datetime] = None) -> None:
+        """Hand a task to this stage, waiting while its queue is full"""
+        task.enqueued_at = enqueued_at or datetime.now()
+        await self.queue.put(task)
+
+    def start(self) -> List[asyncio.Task]:
+        """Spawn the stage workers"""
+        return [
+            asyncio.create_task(self._worker(), name=f"{self.name}-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def _collect(self) -> List[StageTask]:
+        tasks = [await self.queue.get()]
+        if not self.batched:
+            return tasks
+
+        deadline = asyncio.get_running_loop().time() + self.batch_window
+        while len(tasks) < self.batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            try:
+                if remaining > 0:
+                    tasks.append(await asyncio.wait_for(self.queue.get(), remaining))
+                else:
+                    tasks.append(self.queue.get_nowait())
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+
+        return tasks
+
+    async def _worker(self):
+        while True:
+            tasks = await self._collect()
+
+            all_metrics = []
+            for task in tasks:
+                metrics = StageMetrics(
+                    queue_depth=self.queue.qsize(),
+                    wait_seconds=(datetime.now() - task.enqueued_at).total_seconds(),
+                    batch_size=len(tasks)
+                )
+                task.job.stages[self.name] = metrics
+                all_metrics.append(metrics)
+
+            started_at = datetime.now()
+            try:
+                await self._handler(tasks if self.batched else tasks[0])
+            except Exception as e:
+                for task in tasks:
+                    print(f"❌ Stage {self.name} failed for event {task.job.id}: {e}")
+                    if self._on_error is not None:
+                        await self._on_error(task, e)
+            finally:
+                duration = (datetime.now() - started_at).total_seconds()
+                for metrics in all_metrics:
+                    metrics.duration_seconds = duration
+                for _ in tasks:
+                    self.queue.task_done()
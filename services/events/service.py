@@ -1,18 +1,30 @@
 import asyncio
 from asyncio.queues import Queue
 from pathlib import Path
-from typing import Annotated, List
-from datetime import datetime
+from typing import Annotated, Any, Dict, List, Optional
+from datetime import datetime, timedelta
 
 from fastapi import Depends
 
-from externals.objectStorage import ObjectStorage
+from externals.uploader import AsyncUploader
 from database.database import Database
-from database.models import ProcessingRiotEventJob, ProcessingRiotEventStatus
-from dependencies.state import get_database, get_object_storage, get_events_queue, get_events_status, get_model_registry, get_prompt_manager
+from database.writer import JobWriter
+from database.models import AudioSegment, ProcessingRiotEventJob, ProcessingRiotEventStatus, RiotEvent
+from dependencies.state import get_database, get_job_writer, get_uploader, get_events_queue, get_event_coalescer, get_events_status, get_audio_cache, get_llm_cache, get_model_registry, get_prompt_manager, get_settings
+from ai.models.models import Model
+from ai.models.llm.cache import ResponseCache
+from ai.models.tts.audio import AudioClip
+from ai.models.tts.cache import AudioCache
 from ai.models.registry import ModelRegistry
 from ai.prompts.manager import PromptManager
+from server.broadcaster import StatusBroadcaster, Subscription
+from server.coalescer import Burst, EventCoalescer
+from server.scheduler import EventScheduler
+from server.settings import Settings
+from services.events.pipeline import JobProgress, Stage, StageTask
 
+# Event name of jobs answering coalesced events of different types
+COMPOSITE_EVENT = "Composite"
 
 class EventService:
     """Service for managing events"""
@@ -20,54 +32,198 @@ class EventService:
     def __init__(
         self, 
         model_registry: Annotated[ModelRegistry, Depends(get_model_registry)],
-        events_queue: Annotated[Queue[ProcessingRiotEventJob], Depends(get_events_queue)],
-        events_status: Annotated[Queue[ProcessingRiotEventJob], Depends(get_events_status)],
+        events_queue: Annotated[EventScheduler, Depends(get_events_queue)],
+        event_coalescer: Annotated[EventCoalescer, Depends(get_event_coalescer)],
+        events_status: Annotated[StatusBroadcaster, Depends(get_events_status)],
         prompt_manager: Annotated[PromptManager, Depends(get_prompt_manager)],
+        llm_cache: Annotated[ResponseCache, Depends(get_llm_cache)],
+        audio_cache: Annotated[AudioCache, Depends(get_audio_cache)],
         database: Annotated[Database, Depends(get_database)],
-        object_storage: Annotated[ObjectStorage, Depends(get_object_storage)]
+        job_writer: Annotated[JobWriter, Depends(get_job_writer)],
+        uploader: Annotated[AsyncUploader, Depends(get_uploader)],
+        settings: Annotated[Settings, Depends(get_settings)]
     ):
         self._model_registry = model_registry
         self._events_queue = events_queue
+        self._coalescer = event_coalescer
         self._events_status = events_status
         self._prompts_manager = prompt_manager
+        self._llm_cache = llm_cache
+        self._audio_cache = audio_cache
 
-        self._bucket = object_storage
+        self._uploader = uploader
         self._database = database 
+        self._job_writer = job_writer
+        self._settings = settings
 
         self._tracked_events = dict[str, ProcessingRiotEventJob]()
-
-    async def add_events(self, events_ids: List[str]) -> List[str]:
-        """Add events to the queue"""
-
-        result = []
-
-        for id in events_ids:
-
-            riot_event = self._database.get_riot_event_by_id(id)
-            if riot_event is None:
-                raise ValueError(f"Riot event id {id} not found")
-
-            prompt = self._prompts_manager.get_prompt(riot_event.eventName, riot_event.eventData)
-
-            processing_riot_event_job = ProcessingRiotEventJob(
-                riot_event_id=id,
-                status=ProcessingRiotEventStatus.PENDING,
-                input_text=prompt
-            )
-
-            await self._events_queue.put(processing_riot_event_job)
-            await self._events_status.put(processing_riot_event_job)
-
-            self._tracked_events[processing_riot_event_job.id] = processing_riot_event_job
-
-            self._database.save_processing_riot_event_job(processing_riot_event_job)
-        
-            result.append(processing_riot_event_job.id)
-
-        return result
-
-    async def get_last_events_status(self):
-        return await self._events_status.get()
+        self._workers: List[asyncio.Task] = []
+
+    async def add_events(self, events_ids: List[str], llm_model: Optional[str] = None, tts_model: Optional[str] = None) -> List[str]:
+        """Add events to the queue, returning the id of the job answering each of them.
+
+        All riot events are fetched in one query and every prompt is rendered before
+        anything is written, so a bad payload is rejected as a whole with every
+        missing id listed, and the jobs are inserted in a single transaction.
+        The jobs use the given models, or the current ones when unset, and are
+        scheduled with the priority and deadline of their event type.
+
+        An event already pending or processing is not queued again, the id of its
+        job is returned. With a coalescing window, events of the same game session
+        join the open burst of that session: a single job answers them from the
+        composite prompt, and is queued once the burst closes.
+        """
+        self._model_registry.validate("llm", llm_model)
+        self._model_registry.validate("tts", tts_model)
+
+        riot_events = await self._database.get_riot_events_by_ids(events_ids)
+
+        missing = [id for id in events_ids if id not in riot_events]
+        if missing:
+            raise ValueError(f"Riot event ids not found: {', '.join(missing)}")
+
+        prompts = {
+            id: self._prompts_manager.get_prompt(riot_events[id].eventName, riot_events[id].eventData)
+            for id in events_ids
+        }
+
+        coalescer = self._coalescer
+        answered_by = dict[str, ProcessingRiotEventJob]()
+        # Bursts of the jobs created here, only shared once the jobs are saved
+        opened = dict[str, Burst]()
+        bursts = list[Burst]()
+        jobs = []
+        # Events are tracked as they go, repeated ids included, until the jobs are saved
+        # anything failing on the way releases them so the events can be added again
+        try:
+            for id in events_ids:
+                job = coalescer.duplicate_of(id)
+                if job is not None:
+                    print(f"♻️  Event {id} is already answered by job {job.id}")
+                    answered_by[id] = job
+                    continue
+
+                riot_event = riot_events[id]
+                burst = None
+                if coalescer.window:
+                    session_id = riot_event.gameSessionId
+                    burst = opened.get(session_id)
+                    if burst is not None:
+                        self._compose(burst.job, burst.events + [riot_event])
+                        coalescer.join(burst, riot_event)
+                        if len(burst.events) >= coalescer.max_events:
+                            del opened[session_id]
+                    else:
+                        burst = coalescer.burst_for(session_id, llm_model, tts_model)
+                        if burst is not None and not self._join(burst, riot_event):
+                            burst = None
+
+                if burst is None:
+                    job = ProcessingRiotEventJob(
+                        riot_event_id=id,
+                        riot_event_ids=[id],
+                        event_name=riot_event.eventName,
+                        llm_model=llm_model,
+                        tts_model=tts_model,
+                        status=ProcessingRiotEventStatus.PENDING,
+                        input_text=prompts[id]
+                    )
+                    jobs.append(job)
+                    if coalescer.window:
+                        burst = Burst(riot_event.gameSessionId, job, riot_event)
+                        bursts.append(burst)
+                        opened[burst.session_id] = burst
+
+                answered_by[id] = burst.job if burst is not None else job
+                coalescer.track(id, answered_by[id])
+
+            if not jobs:
+                # Every event was a duplicate or joined a burst already saved
+                return [answered_by[id].id for id in events_ids]
+
+            await self._database.save_processing_riot_event_jobs(jobs)
+        except Exception:
+            for job in jobs:
+                coalescer.release(job)
+            raise
+
+        self._job_writer.track(jobs)
+
+        for job in jobs:
+            self._tracked_events[job.id] = job
+
+        if coalescer.window:
+            for burst in bursts:
+                coalescer.open(burst, self._queue_burst)
+        else:
+            for job in jobs:
+                self._queue(job)
+
+        return [answered_by[id].id for id in events_ids]
+
+    def _compose(self, job: ProcessingRiotEventJob, riot_events: List[RiotEvent]):
+        """Set the prompt and event name of a job answering the given events"""
+        event_names = {riot_event.eventName for riot_event in riot_events}
+        job.input_text = self._prompts_manager.get_composite_prompt(
+            [(riot_event.eventName, riot_event.eventData) for riot_event in riot_events]
+        )
+        job.event_name = riot_events[0].eventName if len(event_names) == 1 else COMPOSITE_EVENT
+        job.riot_event_ids = [riot_event.id for riot_event in riot_events]
+
+    def _join(self, burst: Burst, riot_event: RiotEvent) -> bool:
+        """Add an event to a burst opened by an earlier call, False when it cannot join"""
+        try:
+            self._compose(burst.job, burst.events + [riot_event])
+        except ValueError as e:
+            # Prompts reloaded since the burst opened no longer render its events
+            print(f"⚠️  Event {riot_event.id} not coalesced with job {burst.job.id}: {e}")
+            return False
+
+        print(f"🧩 Event {riot_event.id} coalesced into job {burst.job.id}")
+        # The saved job gets its new prompt on the next flush
+        self._job_writer.update(burst.job)
+        self._coalescer.join(burst, riot_event)
+        return True
+
+    def _queue_burst(self, burst: Burst):
+        if len(burst.events) > 1:
+            print(f"🧩 Queuing job {burst.job.id} for {len(burst.events)} events of game {burst.session_id}")
+        self._queue(burst.job, [riot_event.eventName for riot_event in burst.events])
+
+    def _queue(self, job: ProcessingRiotEventJob, event_names: Optional[List[str]] = None):
+        self._schedule(job, event_names or [job.event_name])
+        self._events_queue.put(job)
+        self._events_status.publish(job)
+
+    def _schedule(self, job: ProcessingRiotEventJob, event_names: List[str]):
+        """Set the priority, deadline and expiry action of the job from its event prompts.
+
+        A job answering several events takes the highest priority and the earliest
+        deadline among them, and is downgraded rather than dropped when any of them
+        asks for it.
+        """
+        defaults = self._settings.scheduler
+        schedules = [self._prompts_manager.get_schedule(event_name) for event_name in event_names]
+        priorities = [priority for priority, _, _ in schedules if priority is not None]
+        deadlines = [deadline for _, deadline, _ in schedules if deadline is not None]
+        actions = {on_expiry for _, _, on_expiry in schedules if on_expiry is not None}
+
+        job.priority = max(priorities) if priorities else defaults.default_priority
+        if actions:
+            job.on_expiry = "downgrade" if "downgrade" in actions else "drop"
+        else:
+            job.on_expiry = defaults.on_expiry
+        deadline = min(deadlines) if deadlines else defaults.default_deadline
+        if deadline:
+            job.deadline_at = job.created_at + timedelta(seconds=deadline)
+
+    def get_scheduler_stats(self) -> Dict[str, Any]:
+        """Get the queue wait and expiry counters per event type, and the ingestion counters"""
+        return {**self._events_queue.stats(), **self._coalescer.stats()}
+
+    def subscribe_events_status(self, last_event_id: Optional[int] = None) -> Subscription:
+        """Subscribe to job status updates, replaying those after `last_event_id`"""
+        return self._events_status.subscribe(last_event_id)
 
     def get_tracked_events_values(self):
         """Get all tracked events"""
@@ -75,64 +231,344 @@ class EventService:
 
     async def clear_events(self):
         """Clear all events"""
-        sizes = (len(self._tracked_events), self._events_queue.qsize(), self._events_status.qsize()) 
+        tracked = len(self._tracked_events)
         
         self._tracked_events.clear()
         
-        while not self._events_queue.empty():
-            self._events_queue.get_nowait()
+        # Jobs of open bursts were not queued yet, they are dropped with the queue
+        queue = self._events_queue.clear() + self._coalescer.clear()
 
-        while not self._events_status.empty():
-            self._events_status.get_nowait()
-
-        return sizes
+        return tracked, queue, self._events_status.clear()
 
     async def events_processor(self):
-        """Task that processes events"""        
-        while True:
-
-            last_event = await self._events_queue.get()
-
-            print(f"🤖 Processing event id {last_event.id}")
-
-            last_event.status = ProcessingRiotEventStatus.PROCESSING
-            self._database.update_processing_riot_events_job(last_event)
-            await self._events_status.put(last_event)
-
-            current_llm = self._model_registry.current_llm
-            last_event.llm_started_at = datetime.now()
-            last_event.llm_model_name = current_llm.model_name
-
-            response = await asyncio.to_thread(current_llm.generate, self._prompts_manager.get_system_prompt(), last_event.input_text)
+        """Task that processes events through the LLM, TTS, upload and persistence stages.
 
-            last_event.llm_completed_at = datetime.now()
-            last_event.llm_text = response['answer']
+        Stages are linked by bounded queues so the TTS, upload and database work of
+        one event overlaps with the generation of the next one.
+        """
+        stages = self._settings.pipeline.stages
 
-            print(f"📝 Raw response LLM {response['answer'][:25]}...")
+        self._llm_stage = Stage("llm", self._run_llm, self._fail, batched=True, **vars(stages["llm"]))
+        self._tts_stage = Stage("tts", self._run_tts, self._fail, batched=True, **vars(stages["tts"]))
+        self._upload_stage = Stage("upload", self._run_upload, self._fail, **vars(stages["upload"]))
+        self._persistence_stage = Stage("persistence", self._run_persistence, None, **vars(stages["persistence"]))
+        self._progress = dict[str, JobProgress]()
 
-            current_tts = self._model_registry.current_tts
-            last_event.tts_started_at = datetime.now()
-            last_event.tts_model_name = current_tts.model_name
-            audio_path,audio_duration = await asyncio.to_thread(current_tts.generate, response['answer'])
+        self._workers = []
+        for stage in (self._llm_stage, self._tts_stage, self._upload_stage, self._persistence_stage):
+            self._workers.extend(stage.start())
+            print(f"✅ Stage {stage.name} started with {stage.concurrency} worker(s)")
 
-            last_event.tts_completed_at = datetime.now()
-
-            print(f"🔊 Audio path bucket {audio_path}")
-
-            audio_url = self._bucket.upload(audio_path)
-
-            last_event.audio_url = audio_url
-            last_event.audio_duration = audio_duration
-
-            self._tracked_events.pop(last_event.id)
+        while True:
+            job = await self._events_queue.get()
+            if job.on_expiry == "drop" and self._events_queue.is_expired(job):
+                await self._expire(job)
+                continue
+            await self._llm_stage.put(StageTask(job), enqueued_at=job.created_at)
+
+    async def _run_llm(self, tasks: List[StageTask]):
+        """Generate the answers of the collected jobs, one batch per requested model"""
+        # The startup warmup runs on the same backends, which are not safe to share
+        await self._model_registry.warmed_up()
+
+        # Jobs can also run out of time waiting in the stage queue
+        live = []
+        for task in tasks:
+            if task.job.on_expiry == "drop" and self._events_queue.is_expired(task.job):
+                await self._expire(task.job)
+            else:
+                live.append(task)
+        tasks = live
+
+        for model_name, group in self._by_model("llm", tasks, lambda job: job.llm_model).items():
+            await self._generate_answers(group, await self._model_registry.instance("llm", model_name))
+
+    def _by_model(self, kind: str, tasks: List[StageTask], requested) -> Dict[str, List[StageTask]]:
+        groups: Dict[str, List[StageTask]] = {}
+        for task in tasks:
+            groups.setdefault(self._model_registry.validate(kind, requested(task.job)), []).append(task)
+        return groups
+
+    async def _generate_answers(self, tasks: List[StageTask], current_llm: Model):
+        """Generate the answers of jobs sharing a model, batched when several are waiting"""
+        for task in tasks:
+            job = task.job
+            print(f"🤖 Processing event id {job.id}")
+
+            job.status = ProcessingRiotEventStatus.PROCESSING
+            job.llm_started_at = datetime.now()
+            job.llm_model_name = current_llm.model_name
+            self._progress[job.id] = JobProgress()
+            await self._persistence_stage.put(StageTask(job))
+
+        system_prompt = self._prompts_manager.get_system_prompt()
+
+        keys = {}
+        if self._settings.llm_cache.enabled:
+            sampling_params = current_llm.sampling_params()
+            for task in tasks:
+                if self._prompts_manager.is_cacheable(task.job.event_name):
+                    keys[task.job.id] = self._llm_cache.key(current_llm.model_name, system_prompt, sampling_params, task.job.input_text)
+
+        misses = []
+        for task in tasks:
+            response = await asyncio.to_thread(self._llm_cache.get, keys[task.job.id]) if task.job.id in keys else None
+            if response is None:
+                misses.append(task)
+            else:
+                print(f"🗃️  Cached response for event {task.job.id}")
+                await self._answer(task.job, response)
+
+        if not misses:
+            return
+
+        # Streaming only pays off when the job does not wait behind others
+        if self._settings.pipeline.streaming and len(misses) == 1:
+            job = misses[0].job
+            with self._model_registry.using(current_llm):
+                await self._model_registry.load(current_llm)
+                await self._generate_streaming(job, current_llm)
+            if job.id in keys and job.llm_text:
+                await asyncio.to_thread(self._llm_cache.put, keys[job.id], {"answer": job.llm_text})
+            return
+
+        if len(misses) > 1:
+            print(f"🤖 Generating a batch of {len(misses)} events")
+
+        # A model switched out meanwhile is only unloaded once the batch is done
+        with self._model_registry.using(current_llm):
+            await self._model_registry.load(current_llm)
+            responses = await asyncio.to_thread(
+                current_llm.generate_batch,
+                system_prompt,
+                [task.job.input_text for task in misses]
+            )
 
-            last_event.status = ProcessingRiotEventStatus.COMPLETED
+        for task, response in zip(misses, responses):
+            if task.job.id in keys:
+                await asyncio.to_thread(self._llm_cache.put, keys[task.job.id], response)
+            await self._answer(task.job, response)
+
+    async def _answer(self, job: ProcessingRiotEventJob, response: dict):
+        """Record the generated answer and send it to the TTS stage"""
+        job.llm_completed_at = datetime.now()
+        job.llm_text = response['answer']
 
-            self._database.update_processing_riot_events_job(last_event)
+        print(f"📝 Raw response LLM {response['answer'][:25]}...")
 
-            print(f"🔍 Event completed: {last_event.id}")
+        await self._tts_stage.put(StageTask(job, text=response['answer']))
+        await self._expect_segments(job, 1)
+
+    async def _generate_streaming(self, job: ProcessingRiotEventJob, current_llm: Model):
+        """Send each sentence of the answer to the TTS stage as soon as it is decoded.
 
-            await self._events_status.put(last_event)
+        Audio is exposed through `audio_segments`, one clip per sentence, so clients
+        can start playback before the LLM is done.
+        """
+        loop = asyncio.get_running_loop()
+        sentences = Queue[str | None]()
+        system_prompt = self._prompts_manager.get_system_prompt()
+
+        def produce():
+            try:
+                for sentence in current_llm.generate_stream(system_prompt, job.input_text):
+                    loop.call_soon_threadsafe(sentences.put_nowait, sentence)
+                job.llm_completed_at = datetime.now()
+            finally:
+                loop.call_soon_threadsafe(sentences.put_nowait, None)
+
+        producer = asyncio.create_task(asyncio.to_thread(produce))
+
+        texts = []
+        while (sentence := await sentences.get()) is not None:
+            await self._tts_stage.put(StageTask(job, text=sentence, segment=len(texts)))
+            texts.append(sentence)
+
+        await producer
+
+        job.llm_text = " ".join(texts)
+        await self._expect_segments(job, len(texts))
+
+    async def _run_tts(self, tasks: List[StageTask]):
+        """Synthesize every text collected by the stage in a single batched forward pass"""
+        await self._model_registry.warmed_up()
+        tasks = [task for task in tasks if task.job.id in self._progress]
+        for model_name, group in self._by_model("tts", tasks, lambda job: job.tts_model).items():
+            await self._synthesize(group, await self._model_registry.instance("tts", model_name))
+
+    async def _synthesize(self, tasks: List[StageTask], current_tts: Model):
+        """Synthesize the texts of jobs sharing a model, reusing already uploaded clips"""
+        for task in tasks:
+            task.job.tts_model_name = current_tts.model_name
+            if task.job.tts_started_at is None:
+                task.job.tts_started_at = datetime.now()
+
+        for task in tasks:
+            task.audio_key = self._audio_cache.key(current_tts.model_name, task.text)
+
+        if self._settings.tts_cache.enabled:
+            cached = await asyncio.to_thread(self._audio_cache.get_many, [task.audio_key for task in tasks])
+
+            misses = []
+            for task in tasks:
+                if task.audio_key in cached:
+                    print(f"🗃️  Cached audio for event {task.job.id}")
+                    task.job.tts_completed_at = datetime.now()
+                    await self._add_audio(task, cached[task.audio_key].audio_url, cached[task.audio_key].audio_duration)
+                else:
+                    misses.append(task)
+
+            tasks = misses
+            if not tasks:
+                return
+
+        if len(tasks) > 1:
+            print(f"🔊 Synthesizing a batch of {len(tasks)} texts")
+
+        with self._model_registry.using(current_tts):
+            await self._model_registry.load(current_tts)
+            clips = await asyncio.to_thread(current_tts.generate_batch, [task.text for task in tasks])
+
+        for task, clip in zip(tasks, clips):
+            task.audio = clip
+            task.job.tts_completed_at = datetime.now()
+            await self._upload_stage.put(task)
+
+    async def _run_upload(self, task: StageTask):
+        # Content addressed, the same text by the same model always lands on the same object
+        key = f"tts_{task.audio_key}.wav"
+
+        local_copy_dir = self._settings.audio.local_copy_dir
+        if local_copy_dir:
+            await asyncio.to_thread(task.audio.save, str(Path(local_copy_dir) / key))
+
+        print(f"🔊 Audio key bucket {key}")
+
+        progress = self._progress.get(task.job.id)
+        if task.segment is not None and progress is not None:
+            progress.clips[task.segment] = task.audio
+
+        audio_url = await self._uploader.upload(task.audio.data, key, task.audio.content_type)
+
+        if self._settings.tts_cache.enabled:
+            await asyncio.to_thread(self._audio_cache.put, task.audio_key, audio_url, task.audio.duration)
+
+        await self._add_audio(task, audio_url, task.audio.duration)
+
+    async def _add_audio(self, task: StageTask, audio_url: str, audio_duration: float):
+        """Attach an uploaded clip to its job, completing the job with its last clip"""
+        job = task.job
+        progress = self._progress.get(job.id)
+        if progress is None:
+            return
+
+        if task.segment is None:
+            job.audio_url = audio_url
+            job.audio_duration = audio_duration
+        else:
+            job.audio_segments.append(AudioSegment(
+                index=task.segment,
+                text=task.text,
+                audio_url=audio_url,
+                audio_duration=audio_duration
+            ))
+            job.audio_segments.sort(key=lambda segment: segment.index)
+            job.audio_duration = sum(segment.audio_duration for segment in job.audio_segments)
+
+            print(f"🔊 Segment {task.segment} ready for event {job.id}")
+            self._events_status.publish(job)
+
+        progress.done += 1
+        if progress.complete:
+            await self._complete(job)
+
+    async def _run_persistence(self, task: StageTask):
+        # Written by the job writer on its next flush, merged with later updates
+        self._job_writer.update(task.job)
+        self._events_status.publish(task.job)
+
+    async def _expect_segments(self, job: ProcessingRiotEventJob, count: int):
+        """Record how many clips the job produces, completing it if they are all uploaded"""
+        progress = self._progress.get(job.id)
+        if progress is None:
+            return
+
+        progress.expected = count
+        if progress.complete:
+            await self._complete(job)
+
+    async def _complete(self, job: ProcessingRiotEventJob):
+        progress = self._progress.pop(job.id, None)
+        if job.audio_segments and job.audio_url is None:
+            await self._join_segments(job, progress.clips if progress is not None else {})
+
+        if job.audio_url is None:
+            # An answer without a single complete sentence has nothing to play
+            await self._fail(StageTask(job), ValueError("No audio produced for the answer"))
+            return
+
+        self._tracked_events.pop(job.id, None)
+        self._coalescer.release(job)
+
+        job.status = ProcessingRiotEventStatus.COMPLETED
+
+        print(f"🔍 Event completed: {job.id}")
+
+        await self._persistence_stage.put(StageTask(job))
+
+    async def _join_segments(self, job: ProcessingRiotEventJob, clips: Dict[int, AudioClip]):
+        """Set the audio of a streamed job to its segments joined into one clip.
+
+        Segments served from the audio cache have no samples in memory, the joined clip
+        cached for the same answer is used then, or the first segment as a last resort.
+        """
+        audio_key = self._audio_cache.key(job.tts_model_name, job.llm_text)
+        segments = job.audio_segments
+
+        if all(segment.index in clips for segment in segments):
+            clip = await asyncio.to_thread(AudioClip.concatenate, [clips[segment.index] for segment in segments])
+            job.audio_url = await self._uploader.upload(clip.data, f"tts_{audio_key}.wav", clip.content_type)
+            job.audio_duration = clip.duration
+            if self._settings.tts_cache.enabled:
+                await asyncio.to_thread(self._audio_cache.put, audio_key, job.audio_url, clip.duration)
+            return
+
+        cached = await asyncio.to_thread(self._audio_cache.get_many, [audio_key]) if self._settings.tts_cache.enabled else {}
+        if audio_key in cached:
+            job.audio_url = cached[audio_key].audio_url
+            job.audio_duration = cached[audio_key].audio_duration
+        else:
+            print(f"⚠️  Segments of event {job.id} cannot be joined, its audio is the first segment")
+            job.audio_url = segments[0].audio_url
+
+    async def _expire(self, job: ProcessingRiotEventJob):
+        """Fail a job that waited past its deadline, its moment has passed"""
+        waited = (datetime.now() - job.created_at).total_seconds()
+        deadline = (job.deadline_at - job.created_at).total_seconds()
+        print(f"⌛ Event {job.id} expired after waiting {waited:.1f}s")
+        self._events_queue.expire(job)
+
+        await self._fail(StageTask(job), TimeoutError(f"Expired: waited {waited:.1f}s, deadline {deadline:.0f}s"))
+
+    async def _fail(self, task: StageTask, error: Exception):
+        job = task.job
+        if self._progress.pop(job.id, None) is None and job.status == ProcessingRiotEventStatus.FAILED:
+            return
+
+        self._tracked_events.pop(job.id, None)
+        self._coalescer.release(job)
+
+        job.status = ProcessingRiotEventStatus.FAILED
+        job.error_message = str(error)
+
+        await self._persistence_stage.put(StageTask(job))
+
+    async def stop(self):
+        """Cancel the stage workers, no job is updated afterwards"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
 
     async def start_background_tasks(self):
         """This will be called when the server starts"""